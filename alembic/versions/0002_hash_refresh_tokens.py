@@ -0,0 +1,95 @@
+"""store refresh tokens as jti + SHA-256 digest
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Replaces the full JWT string in refresh_tokens.token with a compact
+lookup id (jti) and a fixed-width 32-byte digest. Existing rows are
+backfilled in batches from the stored token before the column is dropped.
+Downgrading cannot recover the original tokens, so it deletes all
+refresh tokens (users must log in again).
+"""
+import base64
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+# The jti and SHA-256 digest of a stored token, derived as the app did when this revision
+# was written. Kept inline so later app changes can't alter what this migration writes.
+def refresh_token_keys(token: str):
+    digest = hashlib.sha256(token.encode()).digest()
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        jti = claims.get("jti")
+    except Exception:
+        jti = None
+    if not isinstance(jti, str) or not jti or len(jti) > 32:
+        jti = digest[:16].hex()
+    return jti, digest
+
+
+def upgrade():
+    with op.batch_alter_table("refresh_tokens") as batch:
+        batch.add_column(sa.Column("jti", sa.String(32), nullable=True))
+        batch.add_column(sa.Column("token_hash", sa.LargeBinary(32), nullable=True))
+
+    conn = op.get_bind()
+    refresh_tokens = sa.table(
+        "refresh_tokens",
+        sa.column("id", sa.Integer),
+        sa.column("token", sa.String),
+        sa.column("jti", sa.String),
+        sa.column("token_hash", sa.LargeBinary),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(refresh_tokens.c.id, refresh_tokens.c.token)
+            .where(refresh_tokens.c.id > last_id)
+            .order_by(refresh_tokens.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            jti, token_hash = refresh_token_keys(row.token)
+            params.append({"row_id": row.id, "jti": jti, "token_hash": token_hash})
+        conn.execute(
+            refresh_tokens.update()
+            .where(refresh_tokens.c.id == sa.bindparam("row_id"))
+            .values(jti=sa.bindparam("jti"), token_hash=sa.bindparam("token_hash")),
+            params,
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table("refresh_tokens") as batch:
+        batch.alter_column("jti", existing_type=sa.String(32), nullable=False)
+        batch.alter_column("token_hash", existing_type=sa.LargeBinary(32), nullable=False)
+        batch.drop_index("ix_refresh_tokens_token")
+        batch.drop_column("token")
+        batch.create_index("ix_refresh_tokens_jti", ["jti"], unique=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM refresh_tokens")
+    with op.batch_alter_table("refresh_tokens") as batch:
+        batch.drop_index("ix_refresh_tokens_jti")
+        batch.add_column(sa.Column("token", sa.String(), nullable=False))
+        batch.create_index("ix_refresh_tokens_token", ["token"], unique=True)
+        batch.drop_column("token_hash")
+        batch.drop_column("jti")
@@ -0,0 +1,23 @@
+"""index refresh_tokens.expires_at for the expiry reaper
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
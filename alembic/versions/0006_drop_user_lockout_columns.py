@@ -0,0 +1,31 @@
+"""drop users.failed_login_attempts and users.lockout_until
+
+Failed-login and lockout counters live in the shared counter storage
+(COUNTER_STORAGE_URI); these columns are no longer read or written.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("lockout_until")
+        batch_op.drop_column("failed_login_attempts")
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("failed_login_attempts", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("lockout_until", sa.DateTime(timezone=True), nullable=True))
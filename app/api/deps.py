@@ -1,5 +1,15 @@
-from app.db.session import SessionLocal
-from fastapi import Depends
+from app.db.session import SessionLocal, get_async_sessionmaker
+import hmac
+from fastapi import Depends, Header, HTTPException, status
+from app.core.config import settings
+from fastapi.security import OAuth2PasswordBearer
+from app.core.security import issued_before, verify_token
+from app.core.token_cache import token_cache
+from app.db import crud, async_crud
+from app.schemas.user import UserResponse
+
+# OAuth2 scheme for extracting the token from requests
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 # Dependency to provide a database session to FastAPI routes
 def get_db():
@@ -7,4 +17,59 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency to provide an async database session to async routes
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+# Decode a bearer token, raising 401 if it is invalid
+def _decode_token(token: str) -> dict:
+    payload = verify_token(token)
+    if not payload or "sub" not in payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload
+
+# Build the cached user projection from an ORM user, raising 404 if missing and 401 if
+# the token was issued before the user's sessions were revoked. The revocation epoch comes
+# with the user row, so only token cache misses pay for the check.
+def _cache_user(token: str, payload: dict, user) -> UserResponse:
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if issued_before(payload, user.tokens_valid_after):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    # Values come from the database and were validated on registration
+    projection = UserResponse.model_construct(id=user.id, email=user.email)
+    token_cache.set(token, payload, projection)
+    return projection
+
+# Dependency resolving the bearer token to the current user, served from the token cache when possible.
+# A database session is only opened on a cache miss with a valid token, so cached and
+# rejected requests never check out a connection; the user lookup may go to a read replica.
+def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached[1]
+    payload = _decode_token(token)
+    db = SessionLocal()
+    try:
+        return _cache_user(token, payload, crud.get_user_by_email(db, payload["sub"], replica=True))
+    finally:
+        db.close()
+
+# Async variant of get_current_user
+async def get_current_user_async(token: str = Depends(oauth2_scheme)) -> UserResponse:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached[1]
+    payload = _decode_token(token)
+    async with get_async_sessionmaker()() as db:
+        return _cache_user(token, payload, await async_crud.get_user_by_email(db, payload["sub"], replica=True))
+
+# Dependency guarding admin endpoints with the X-Admin-Key header (404 when no key is configured)
+def require_admin(x_admin_key: str = Header(default="")):
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(x_admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
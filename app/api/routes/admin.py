@@ -0,0 +1,72 @@
+# Admin endpoints for bulk user import/export, guarded by ADMIN_API_KEY
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.api.deps import get_db, require_admin
+from app.db import crud
+from app.db.session import SessionLocal
+from app.schemas.user import SessionResponse
+from app.services.bulk_users import FORMATS, export_users, import_users, iter_records
+from app.services.user_service import revoke_user_sessions
+
+# Create an API router for admin endpoints
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _import_file(spool, fmt: str):
+    db = SessionLocal()
+    try:
+        with open(spool.fileno(), encoding="utf-8", newline="", closefd=False) as lines:
+            return import_users(db, iter_records(lines, fmt))
+    finally:
+        db.close()
+
+
+# Bulk user import endpoint
+@router.post("/users/import")
+async def import_users_endpoint(request: Request, format: str = Query("jsonl", enum=list(FORMATS))):
+    """
+    Import users from a CSV or JSONL request body. Records carry "email" and
+    either "password" (hashed in parallel) or a pre-computed "hashed_password".
+    The body is spooled to disk as it streams in, then imported in batches.
+    Returns imported/existing/duplicate/invalid counts.
+    """
+    with tempfile.TemporaryFile() as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        return await run_in_threadpool(_import_file, spool, format)
+
+
+# Bulk user export endpoint
+@router.get("/users/export")
+def export_users_endpoint(format: str = Query("jsonl", enum=list(FORMATS)), db=Depends(get_db)):
+    """
+    Stream all users (including password hashes) as CSV or JSONL.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(export_users(db, format), media_type=media_type)
+
+
+# List a user's sessions endpoint
+@router.get("/users/{user_id}/sessions", response_model=list[SessionResponse])
+def list_user_sessions(user_id: int, db=Depends(get_db)):
+    """
+    List a user's active sessions (unexpired refresh tokens), newest first.
+    """
+    if not crud.get_user_by_id(db, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return crud.get_user_sessions(db, user_id)
+
+
+# Revoke all of a user's sessions endpoint
+@router.delete("/users/{user_id}/sessions")
+def revoke_user_sessions_endpoint(user_id: int, db=Depends(get_db)):
+    """
+    Revoke all of a user's sessions, including outstanding access tokens.
+    """
+    user = crud.get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return {"revoked": revoke_user_sessions(db, user.id, user.email)}
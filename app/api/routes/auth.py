@@ -1,44 +1,50 @@
 # Import FastAPI and dependencies
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 # Import schemas for request and response validation
-from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, RefreshTokenRequest, ChangePasswordRequest
+from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, RefreshTokenRequest, ChangePasswordRequest, SessionResponse
 # Import CRUD and service logic
 from app.db import crud
-from app.services.user_service import authenticate_user, issue_tokens, validate_and_rotate_refresh_token, change_user_password
-from app.api.deps import get_db
-from app.core.security import create_access_token, verify_token
-from fastapi.security import OAuth2PasswordBearer
+from app.services.user_service import authenticate_user, issue_tokens, validate_and_rotate_refresh_token, change_user_password, revoke_refresh_token, revoke_user_sessions
+from app.core.email_filter import email_filter
+from app.core.responses import json_response
+from app.api.deps import get_db, get_current_user
 
 # Create an API router for authentication endpoints
 router = APIRouter()
-# OAuth2 scheme for extracting the token from requests
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 # User registration endpoint
 @router.post("/register", response_model=UserResponse)
 def register(user_in: UserCreate, db: Session = Depends(get_db)):
     """
     Register a new user with email and password.
-    Returns the created user (without password).
+    Returns the created user (without password), serialized directly
+    since the email was validated on input.
+    Skips the existence check when the email filter knows the email is new;
+    the unique constraint on email still rejects duplicates.
     """
-    user = crud.get_user_by_email(db, user_in.email)
-    if user:
+    if email_filter.might_contain(user_in.email) and crud.get_user_by_email(db, user_in.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = crud.create_user(db, user_in.email, user_in.password)
-    return user
+    try:
+        user = crud.create_user(db, user_in.email, user_in.password)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return json_response({"id": user.id, "email": user.email})
 
 # User login endpoint
 @router.post("/login", response_model=TokenResponse)
 def login(user_in: UserLogin, db: Session = Depends(get_db)):
     """
     Authenticate user and return access and refresh tokens.
+    The token body is built from freshly signed tokens and serialized directly.
     """
     user = authenticate_user(db, user_in.email, user_in.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     access_token, refresh_token = issue_tokens(db, user)
-    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    return json_response({"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"})
 
 # Token refresh endpoint
 @router.post("/refresh", response_model=TokenResponse)
@@ -49,7 +55,7 @@ def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
     access_token, refresh_token = validate_and_rotate_refresh_token(db, request.refresh_token)
     if not access_token or not refresh_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    return json_response({"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"})
 
 # Logout endpoint
 @router.post("/logout")
@@ -57,20 +63,17 @@ def logout(request: RefreshTokenRequest, db: Session = Depends(get_db)):
     """
     Revoke (delete) the provided refresh token, logging the user out.
     """
-    crud.delete_refresh_token(db, request.refresh_token)
+    revoke_refresh_token(db, request.refresh_token)
     return {"msg": "Logged out successfully."}
 
 # Change password endpoint
 @router.post("/change-password")
-def change_password(request: ChangePasswordRequest, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def change_password(request: ChangePasswordRequest, current_user: UserResponse = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Change the password for the authenticated user.
     Requires the old password for verification.
     """
-    payload = verify_token(token)
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = crud.get_user_by_email(db, payload["sub"])
+    user = crud.get_user_by_id(db, current_user.id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     success = change_user_password(db, user, request.old_password, request.new_password)
@@ -80,14 +83,38 @@ def change_password(request: ChangePasswordRequest, token: str = Depends(oauth2_
 
 # Get current user profile endpoint
 @router.get("/me", response_model=UserResponse)
-def get_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_me(current_user: UserResponse = Depends(get_current_user)):
     """
     Get the profile of the currently authenticated user.
+    Served from the token cache when the same token was seen recently.
+    The cached projection is already validated, so it is serialized directly.
     """
-    payload = verify_token(token)
-    if not payload or "sub" not in payload:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = crud.get_user_by_email(db, payload["sub"])
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return user 
\ No newline at end of file
+    return json_response({"id": current_user.id, "email": current_user.email})
+
+# List sessions endpoint
+@router.get("/sessions", response_model=list[SessionResponse])
+def list_sessions(current_user: UserResponse = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    List the authenticated user's active sessions (unexpired refresh tokens), newest first.
+    """
+    return crud.get_user_sessions(db, current_user.id)
+
+# Revoke one session endpoint
+@router.delete("/sessions/{session_id}")
+def revoke_session(session_id: int, current_user: UserResponse = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Revoke one of the authenticated user's sessions by id.
+    """
+    if not crud.delete_user_session(db, current_user.id, session_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    return {"msg": "Session revoked."}
+
+# Revoke all sessions endpoint
+@router.delete("/sessions")
+def revoke_all_sessions(current_user: UserResponse = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Revoke all of the authenticated user's sessions, including the access
+    token used for this request.
+    """
+    revoked = revoke_user_sessions(db, current_user.id, current_user.email)
+    return {"msg": "All sessions revoked.", "revoked": revoked}
@@ -0,0 +1,120 @@
+# Async variant of the authentication routes, mounted when settings.ASYNC_DB is enabled
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+# Import schemas for request and response validation
+from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, RefreshTokenRequest, ChangePasswordRequest, SessionResponse
+# Import async CRUD and service logic
+from app.db import async_crud
+from app.services.async_user_service import authenticate_user, issue_tokens, validate_and_rotate_refresh_token, change_user_password, revoke_refresh_token, revoke_user_sessions
+from app.core.email_filter import email_filter
+from app.core.responses import json_response
+from app.api.deps import get_async_db, get_current_user_async
+
+# Create an API router for authentication endpoints
+router = APIRouter()
+
+# User registration endpoint
+@router.post("/register", response_model=UserResponse)
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Register a new user with email and password.
+    Returns the created user (without password), serialized directly
+    since the email was validated on input.
+    Skips the existence check when the email filter knows the email is new;
+    the unique constraint on email still rejects duplicates.
+    """
+    if email_filter.might_contain(user_in.email) and await async_crud.get_user_by_email(db, user_in.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    try:
+        user = await async_crud.create_user(db, user_in.email, user_in.password)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return json_response({"id": user.id, "email": user.email})
+
+# User login endpoint
+@router.post("/login", response_model=TokenResponse)
+async def login(user_in: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    """
+    Authenticate user and return access and refresh tokens.
+    The token body is built from freshly signed tokens and serialized directly.
+    """
+    user = await authenticate_user(db, user_in.email, user_in.password)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    access_token, refresh_token = await issue_tokens(db, user)
+    return json_response({"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"})
+
+# Token refresh endpoint
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_token(request: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a valid refresh token for a new access and refresh token pair.
+    """
+    access_token, refresh_token = await validate_and_rotate_refresh_token(db, request.refresh_token)
+    if not access_token or not refresh_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    return json_response({"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"})
+
+# Logout endpoint
+@router.post("/logout")
+async def logout(request: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Revoke (delete) the provided refresh token, logging the user out.
+    """
+    await revoke_refresh_token(db, request.refresh_token)
+    return {"msg": "Logged out successfully."}
+
+# Change password endpoint
+@router.post("/change-password")
+async def change_password(request: ChangePasswordRequest, current_user: UserResponse = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    """
+    Change the password for the authenticated user.
+    Requires the old password for verification.
+    """
+    user = await async_crud.get_user_by_id(db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    success = await change_user_password(db, user, request.old_password, request.new_password)
+    if not success:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Old password is incorrect")
+    return {"msg": "Password changed successfully."}
+
+# Get current user profile endpoint
+@router.get("/me", response_model=UserResponse)
+async def get_me(current_user: UserResponse = Depends(get_current_user_async)):
+    """
+    Get the profile of the currently authenticated user.
+    Served from the token cache when the same token was seen recently.
+    The cached projection is already validated, so it is serialized directly.
+    """
+    return json_response({"id": current_user.id, "email": current_user.email})
+
+# List sessions endpoint
+@router.get("/sessions", response_model=list[SessionResponse])
+async def list_sessions(current_user: UserResponse = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    """
+    List the authenticated user's active sessions (unexpired refresh tokens), newest first.
+    """
+    return await async_crud.get_user_sessions(db, current_user.id)
+
+# Revoke one session endpoint
+@router.delete("/sessions/{session_id}")
+async def revoke_session(session_id: int, current_user: UserResponse = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    """
+    Revoke one of the authenticated user's sessions by id.
+    """
+    if not await async_crud.delete_user_session(db, current_user.id, session_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    return {"msg": "Session revoked."}
+
+# Revoke all sessions endpoint
+@router.delete("/sessions")
+async def revoke_all_sessions(current_user: UserResponse = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    """
+    Revoke all of the authenticated user's sessions, including the access
+    token used for this request.
+    """
+    revoked = await revoke_user_sessions(db, current_user.id, current_user.email)
+    return {"msg": "All sessions revoked.", "revoked": revoked}
@@ -0,0 +1,24 @@
+# JSON Web Key Set endpoint for offline verification of access tokens
+from fastapi import APIRouter, Request, Response
+from app.core.config import settings
+from app.core.keys import get_keyset
+
+# Create an API router for the JWKS endpoint
+router = APIRouter()
+
+# Public signing keys endpoint
+@router.get("/.well-known/jwks.json")
+def jwks(request: Request):
+    """
+    Return the public keys (by kid) that verify tokens issued by this service.
+    The document is pre-serialized and served with strong caching headers.
+    """
+    keyset = get_keyset()
+    body, etag = keyset.jwks() if keyset is not None else (b'{"keys":[]}', '"empty"')
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}, stale-while-revalidate={settings.JWKS_MAX_AGE_SECONDS}",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
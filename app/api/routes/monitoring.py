@@ -0,0 +1,110 @@
+# Monitoring endpoints exposing in-process statistics and Prometheus metrics
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_admin
+from app.core.metrics import registry
+from app.core.token_cache import token_cache
+from app.core.email_filter import email_filter
+from app.services.token_reaper import reaper_stats
+from app.services.last_login import last_login_writer
+from app.db.pool import pool_stats
+from app.db.replicas import replica_router
+from app.db.session import get_engine
+
+# Create an API router for monitoring endpoints, guarded by ADMIN_API_KEY like /admin
+router = APIRouter(dependencies=[Depends(require_admin)])
+# Router for the top-level /metrics scrape endpoint
+metrics_router = APIRouter()
+
+# Access-token cache statistics endpoint
+@router.get("/token-cache")
+def token_cache_stats():
+    """
+    Return hit/miss counters and current size of the access-token cache.
+    """
+    return token_cache.stats()
+
+# Expired refresh token reaper statistics endpoint
+@router.get("/token-reaper")
+def token_reaper_stats():
+    """
+    Return rows purged by the last reaper run and in total.
+    """
+    return reaper_stats
+
+# Database connection pool statistics endpoint
+@router.get("/db-pool")
+def db_pool_stats():
+    """
+    Return connection checkout counts, wait times and timeouts for the pool.
+    """
+    return {**pool_stats.snapshot(), "status": get_engine().pool.status()}
+
+# Batched last-login writer statistics endpoint
+@router.get("/last-login")
+def last_login_stats():
+    """
+    Return pending, recorded, skipped and written last-login updates and flush counts.
+    """
+    return last_login_writer.stats()
+
+# Read replica health and routing statistics endpoint
+@router.get("/db-replicas")
+def db_replica_stats():
+    """
+    Return health, lag, read and failure counts per read replica, and how often
+    replica reads fell back to the primary.
+    """
+    return replica_router.stats()
+
+# Registered-email filter statistics endpoint
+@router.get("/email-filter")
+def email_filter_stats():
+    """
+    Return size, memory use, estimated false-positive rate and lookup counters of the email filter.
+    """
+    return email_filter.stats()
+
+# Export the component statistics above as metrics at scrape time
+def _component_metrics():
+    cache = token_cache.stats()
+    pool = pool_stats.snapshot()
+    emails = email_filter.stats()
+    replicas = replica_router.stats()
+    logins = last_login_writer.stats()
+    values = [
+        ("auth_token_cache_hits_total", "counter", "Access-token cache hits.", cache["hits"]),
+        ("auth_token_cache_misses_total", "counter", "Access-token cache misses.", cache["misses"]),
+        ("auth_token_cache_size", "gauge", "Tokens currently cached.", cache["size"]),
+        ("email_filter_items", "gauge", "Emails added to the registered-email filter.", emails["items"]),
+        ("email_filter_memory_bytes", "gauge", "Memory used by the registered-email filter bit array.", emails["memory_bytes"]),
+        ("email_filter_estimated_fp_rate", "gauge", "Estimated false-positive rate of the email filter.", emails["estimated_fp_rate"] or 0),
+        ("email_filter_definite_misses_total", "counter", "Lookups skipped because the email is definitely unregistered.", emails["definite_misses"]),
+        ("db_pool_checkouts_total", "counter", "Successful connection checkouts.", pool["checkouts"]),
+        ("db_pool_timeouts_total", "counter", "Connection checkouts that timed out.", pool["timeouts"]),
+        ("db_pool_max_wait_seconds", "gauge", "Longest connection checkout wait.", pool["max_wait_ms"] / 1000),
+        ("db_replicas_healthy", "gauge", "Read replicas currently in rotation.", replicas["healthy"]),
+        ("db_replica_reads_total", "counter", "Reads routed to a read replica.", sum(r["reads"] for r in replicas["replicas"])),
+        ("db_replica_fallbacks_total", "counter", "Replica-eligible reads served by the primary after a failure or with no healthy replica.", replicas["fallbacks"]),
+        ("last_login_pending", "gauge", "Last-login writes waiting for the next flush.", logins["pending"]),
+        ("last_login_skipped_total", "counter", "Logins not written because the stored value was recent.", logins["skipped"]),
+        ("last_login_dropped_total", "counter", "Last-login writes dropped because the pending buffer was full.", logins["dropped"]),
+        ("last_login_rows_written_total", "counter", "Last-login rows written by batched flushes.", logins["rows_written"]),
+        ("last_login_flushes_total", "counter", "Batched last-login flushes.", logins["flushes"]),
+        ("refresh_token_reaper_purged_total", "counter", "Expired refresh tokens deleted.", reaper_stats["total_purged"]),
+        ("refresh_token_reaper_last_run_purged", "gauge", "Rows deleted by the last reaper run.", reaper_stats["last_run_purged"]),
+    ]
+    lines = []
+    for name, kind, documentation, value in values:
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return lines
+
+registry.register_collector(_component_metrics)
+
+# Prometheus scrape endpoint
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Return all metrics in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -8,9 +8,76 @@ load_dotenv()
 class Settings:
     PROJECT_NAME: str = "FastAPI Auth App"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "supersecret")
-    ALGORITHM: str = "HS256"
+    ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    # Asymmetric signing keys (RS256/ES256): directory of <kid>.pem files, optional active kid
+    JWT_KEYS_DIR: str = os.getenv("JWT_KEYS_DIR", "keys")
+    JWT_ACTIVE_KID: str = os.getenv("JWT_ACTIVE_KID", "")
+    JWT_KEYS_RELOAD_SECONDS: int = int(os.getenv("JWT_KEYS_RELOAD_SECONDS", "30"))
+    JWKS_MAX_AGE_SECONDS: int = int(os.getenv("JWKS_MAX_AGE_SECONDS", "300"))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     SQLALCHEMY_DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/postgres")
+    # Database connection pool
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # Read replicas (comma-separated URLs) for read-only lookups, their health check
+    # interval, and the replication lag above which a Postgres replica is skipped (0 disables
+    # the bound; users whose password or sessions changed are read from the primary for
+    # this long plus one interval)
+    DB_REPLICA_URLS: str = os.getenv("DB_REPLICA_URLS", "")
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL_SECONDS", "5"))
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+    # Open pool connections, hash once and sign once before the worker reports ready
+    PREWARM: bool = os.getenv("PREWARM", "false").lower() in ("1", "true", "yes")
+    PREWARM_CONNECTIONS: int = int(os.getenv("PREWARM_CONNECTIONS", os.getenv("DB_POOL_SIZE", "5")))
+    # Serve requests through the async engine and async route handlers
+    ASYNC_DB: bool = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+    # Password hashing: the first scheme hashes new passwords, the others are accepted and
+    # upgraded on the next successful login (e.g. "argon2,bcrypt")
+    PASSWORD_HASH_SCHEMES: str = os.getenv("PASSWORD_HASH_SCHEMES", "bcrypt")
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "4"))
+    # Password hashing worker pool (0 workers hashes inline in the calling thread)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+    # Verified access-token cache (size 0 disables it)
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+    # Counter storage for rate limiting and login lockout: memory://, sqlite:///path or redis://host:port/db.
+    # The default SQLite file is shared by every worker on the host and survives restarts.
+    COUNTER_STORAGE_URI: str = os.getenv("COUNTER_STORAGE_URI", "sqlite:///./auth-counters.db")
+    # Worker processes per host (as read by gunicorn/uvicorn); memory:// is refused above 1
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    RATE_LIMIT: str = os.getenv("RATE_LIMIT", "5/second")
+    LOGIN_MAX_FAILED_ATTEMPTS: int = int(os.getenv("LOGIN_MAX_FAILED_ATTEMPTS", "5"))
+    LOCKOUT_MINUTES: int = int(os.getenv("LOCKOUT_MINUTES", "15"))
+    # Background deletion of expired refresh tokens (interval 0 disables the in-app task)
+    REFRESH_TOKEN_REAPER_INTERVAL_SECONDS: int = int(os.getenv("REFRESH_TOKEN_REAPER_INTERVAL_SECONDS", "3600"))
+    REFRESH_TOKEN_REAPER_BATCH_SIZE: int = int(os.getenv("REFRESH_TOKEN_REAPER_BATCH_SIZE", "1000"))
+    # Pause between batches so other writers get the table (and its locks) in between
+    REFRESH_TOKEN_REAPER_BATCH_PAUSE_SECONDS: float = float(os.getenv("REFRESH_TOKEN_REAPER_BATCH_PAUSE_SECONDS", "0.1"))
+    # Last-login tracking: logins within the resolution of the stored value are not
+    # written; others are coalesced per user and flushed in one batched UPDATE per interval
+    LAST_LOGIN_TRACKING: bool = os.getenv("LAST_LOGIN_TRACKING", "true").lower() in ("1", "true", "yes")
+    LAST_LOGIN_RESOLUTION_SECONDS: int = int(os.getenv("LAST_LOGIN_RESOLUTION_SECONDS", "60"))
+    LAST_LOGIN_FLUSH_SECONDS: float = float(os.getenv("LAST_LOGIN_FLUSH_SECONDS", "5"))
+    LAST_LOGIN_MAX_PENDING: int = int(os.getenv("LAST_LOGIN_MAX_PENDING", "10000"))
+    # Bloom filter over registered emails to skip lookups for unknown emails
+    EMAIL_FILTER_ENABLED: bool = os.getenv("EMAIL_FILTER_ENABLED", "true").lower() in ("1", "true", "yes")
+    EMAIL_FILTER_CAPACITY: int = int(os.getenv("EMAIL_FILTER_CAPACITY", "1000000"))
+    EMAIL_FILTER_FP_RATE: float = float(os.getenv("EMAIL_FILTER_FP_RATE", "0.01"))
+    EMAIL_FILTER_SYNC_SECONDS: float = float(os.getenv("EMAIL_FILTER_SYNC_SECONDS", "1.0"))
+    # Bulk user import/export (passwords hash in the PASSWORD_HASH_WORKERS pool) and the admin API key guarding /admin (unset disables /admin)
+    BULK_IMPORT_BATCH_SIZE: int = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "1000"))
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
+    # JSON encoder for responses: auto (orjson, then msgspec, then stdlib), orjson, msgspec or json
+    JSON_RESPONSE_BACKEND: str = os.getenv("JSON_RESPONSE_BACKEND", "auto")
+    # Prometheus-style metrics at /metrics (disabled: no instrumentation overhead)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
 
 # Singleton settings instance
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
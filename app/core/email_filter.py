@@ -0,0 +1,208 @@
+import hashlib
+import math
+import threading
+import time
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.core.storage import get_counter_storage
+
+# In-process Bloom filter over registered emails. A "definitely not registered"
+# answer lets login and register skip the user lookup query, which is most of the
+# cost of credential-stuffing traffic against unknown emails.
+#
+# The filter is built at startup by streaming the users table and updated on every
+# insert in this process. Every insert also bumps a generation counter in the shared
+# counter storage (COUNTER_STORAGE_URI); a miss reads it and, if another worker has
+# inserted users since the last sync, catches up (new rows by id) before answering,
+# so a user registered elsewhere is never refused. Inserts that bypass the app are
+# picked up by the same catch-up at most EMAIL_FILTER_SYNC_SECONDS later.
+#
+# Ids are handed out before commit, so a row can commit after a higher id has been
+# synced. Ids a sync skipped are remembered and looked up again on later syncs until
+# they show up or GAP_SECONDS pass (rolled-back inserts never do). Until the filter
+# is built every email passes.
+
+GENERATION_KEY = "email_filter:generation"
+GENERATION_TTL_SECONDS = 10 * 365 * 86400
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(capacity, 1)
+        self.fp_rate = fp_rate
+        self.num_bits = max(int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    # Expected false-positive rate at the current fill
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class EmailFilter:
+    # How long an id skipped by a sync is looked up again, and at most how many are kept
+    GAP_SECONDS = 600
+    MAX_GAPS = 1000
+
+    def __init__(self, capacity: int, fp_rate: float, sync_seconds: float):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.sync_seconds = sync_seconds
+        self.bloom = None
+        self.last_user_id = 0
+        self.generation = None
+        self.synced_at = 0.0
+        self.lookups = 0
+        self.definite_misses = 0
+        self.syncs = 0
+        self._gaps = {}  # user id skipped by a sync -> when it was first seen missing
+        self._lock = threading.Lock()  # guards the bit array; never held across queries
+        self._sync_lock = threading.Lock()  # serializes builds and syncs
+
+    @property
+    def ready(self) -> bool:
+        return self.bloom is not None
+
+    # Build the filter from the users table, sized for at least twice the current user
+    # count. It is filled off to the side and swapped in once complete.
+    def build(self, session_factory):
+        from app.db import models
+        with self._sync_lock:
+            generation = _current_generation()
+            db = session_factory()
+            try:
+                total = db.execute(select(func.count(models.User.id))).scalar() or 0
+                bloom = BloomFilter(max(self.capacity, total * 2), self.fp_rate)
+                last_user_id, gaps = self._read_users(db, bloom, 0, {})
+            finally:
+                db.close()
+            self.bloom, self.last_user_id, self._gaps = bloom, last_user_id, gaps
+            self._synced(generation)
+
+    # Add users inserted since the last sync (by any process)
+    def sync(self, session_factory):
+        with self._sync_lock:
+            generation = _current_generation()
+            db = session_factory()
+            try:
+                self.last_user_id, self._gaps = self._read_users(db, self.bloom, self.last_user_id, self._gaps)
+            finally:
+                db.close()
+            self._synced(generation)
+
+    # Add users with ids above after_id, and skipped ids that have committed since, to
+    # bloom, paging by id; returns the new high-water id and the ids still missing
+    def _read_users(self, db, bloom, after_id: int, gaps: dict, batch_size: int = 10000):
+        from app.db import models
+        now = time.monotonic()
+        gaps = {user_id: seen for user_id, seen in gaps.items() if now - seen < self.GAP_SECONDS}
+        if gaps:
+            rows = db.execute(select(models.User.id, models.User.email).where(models.User.id.in_(list(gaps)))).all()
+            self._add_rows(bloom, rows)
+            for row in rows:
+                del gaps[row.id]
+        while True:
+            rows = db.execute(
+                select(models.User.id, models.User.email)
+                .where(models.User.id > after_id)
+                .order_by(models.User.id)
+                .limit(batch_size)
+            ).all()
+            self._add_rows(bloom, rows)
+            for row in rows:
+                gaps.update(dict.fromkeys(range(max(after_id + 1, row.id - self.MAX_GAPS), row.id), now))
+                after_id = row.id
+            if len(rows) < batch_size:
+                break
+        if len(gaps) > self.MAX_GAPS:
+            gaps = dict(sorted(gaps.items())[-self.MAX_GAPS:])
+        return after_id, gaps
+
+    def _add_rows(self, bloom, rows):
+        with self._lock:
+            for row in rows:
+                bloom.add(row.email)
+
+    def _synced(self, generation: int):
+        self.generation = generation
+        self.synced_at = time.monotonic()
+        self.syncs += 1
+
+    # Record an email inserted by this process
+    def add(self, email: str):
+        if self.bloom is not None:
+            with self._lock:
+                self.bloom.add(email)
+
+    # Tell every worker sharing the counter storage that users were inserted (call after
+    # commit), so their next miss catches up instead of trusting an older filter
+    def publish(self):
+        if settings.EMAIL_FILTER_ENABLED:
+            get_counter_storage().incr(GENERATION_KEY, GENERATION_TTL_SECONDS)
+
+    # Fast check without touching the database: False means not registered as of the
+    # last sync (recheck before trusting it)
+    def might_contain(self, email: str) -> bool:
+        self.lookups += 1
+        return self.bloom is None or email in self.bloom
+
+    # Whether a miss should trigger a catch-up sync before being trusted: users were
+    # inserted since the last sync, or it is older than sync_seconds
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.synced_at >= self.sync_seconds or _current_generation() != self.generation
+
+    # Confirm a miss: catch up with users inserted elsewhere if the last sync is stale,
+    # then check again. Returns True if the email turned out to be present.
+    def recheck(self, email: str, session_factory) -> bool:
+        if self.bloom is None:
+            return True
+        if self.is_stale():
+            self.sync(session_factory)
+            if email in self.bloom:
+                return True
+        self.definite_misses += 1
+        return False
+
+    # Full check: False means the email is definitely not registered
+    def contains(self, email: str, session_factory) -> bool:
+        return self.might_contain(email) or self.recheck(email, session_factory)
+
+    def stats(self) -> dict:
+        bloom = self.bloom
+        return {
+            "ready": bloom is not None,
+            "items": bloom.count if bloom else 0,
+            "capacity": bloom.capacity if bloom else self.capacity,
+            "memory_bytes": len(bloom.bits) if bloom else 0,
+            "num_hashes": bloom.num_hashes if bloom else 0,
+            "estimated_fp_rate": bloom.estimated_fp_rate() if bloom else None,
+            "lookups": self.lookups,
+            "definite_misses": self.definite_misses,
+            "syncs": self.syncs,
+            "pending_gaps": len(self._gaps),
+        }
+
+
+# Read the shared insert generation
+def _current_generation() -> int:
+    return get_counter_storage().get(GENERATION_KEY)
+
+
+# Singleton filter instance
+email_filter = EmailFilter(settings.EMAIL_FILTER_CAPACITY, settings.EMAIL_FILTER_FP_RATE, settings.EMAIL_FILTER_SYNC_SECONDS)
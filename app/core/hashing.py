@@ -0,0 +1,114 @@
+import asyncio
+import collections
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import timed
+
+# bcrypt is CPU bound and holds the GIL, so hashing runs in a process pool that
+# scales across cores. The number of in-flight jobs (running + queued) is capped
+# so a login storm fails fast instead of building an unbounded backlog.
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(settings.PASSWORD_HASH_QUEUE_SIZE, 1))
+
+
+# Lazily create the shared process pool
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return _executor
+
+
+# Shut down the process pool (called on application shutdown)
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+# Submit a hashing job, failing fast when the queue is full (or waiting for a free
+# slot when block is set)
+def _submit(fn, *args, block: bool = False) -> Future:
+    if not _slots.acquire(blocking=block):
+        raise HashingPoolSaturated()
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        finally:
+            _slots.release()
+        return future
+    try:
+        future = get_executor().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+# Verify a plain password against a hashed password in the worker pool
+@timed("password_verify")
+def verify_password(plain_password, hashed_password):
+    return _submit(security.verify_password, plain_password, hashed_password).result()
+
+
+# Verify a password and compute an upgraded hash if needed, in the worker pool
+@timed("password_verify")
+def verify_and_update_password(plain_password, hashed_password):
+    return _submit(security.verify_and_update_password, plain_password, hashed_password).result()
+
+
+# Hash a password for storage in the worker pool
+@timed("password_hash")
+def get_password_hash(password):
+    return _submit(security.get_password_hash, password).result()
+
+
+# Hash many passwords in the worker pool (bulk imports), returning hashes in order. At
+# most max_in_flight jobs (default half the queue) are queued at once and each waits for
+# a free slot, so a large import shares the pool with logins instead of crowding them out.
+@timed("password_hash_batch")
+def hash_passwords(passwords, max_in_flight: int = None):
+    max_in_flight = max_in_flight or max(settings.PASSWORD_HASH_QUEUE_SIZE // 2, 1)
+    hashes = []
+    in_flight = collections.deque()
+    for password in passwords:
+        if len(in_flight) >= max_in_flight:
+            hashes.append(in_flight.popleft().result())
+        in_flight.append(_submit(security.get_password_hash, password, block=True))
+    hashes.extend(future.result() for future in in_flight)
+    return hashes
+
+
+# Async variant of verify_password that awaits the worker without blocking the event loop
+@timed("password_verify")
+async def verify_password_async(plain_password, hashed_password):
+    return await asyncio.wrap_future(_submit(security.verify_password, plain_password, hashed_password))
+
+
+# Async variant of verify_and_update_password
+@timed("password_verify")
+async def verify_and_update_password_async(plain_password, hashed_password):
+    return await asyncio.wrap_future(_submit(security.verify_and_update_password, plain_password, hashed_password))
+
+
+# Async variant of get_password_hash
+@timed("password_hash")
+async def get_password_hash_async(password):
+    return await asyncio.wrap_future(_submit(security.get_password_hash, password))
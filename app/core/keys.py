@@ -0,0 +1,196 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from app.core.config import settings
+
+# JWT signing keys. With an asymmetric ALGORITHM (RS256/ES256) keys are read from
+# JWT_KEYS_DIR, one "<kid>.pem" private key per file, and parsed once into key
+# objects (parsing an RSA PEM costs tens of milliseconds, signing with the parsed
+# key well under one). Retired keys can stay as "<kid>.pub.pem" public keys so
+# tokens they signed still verify. Tokens carry the signing key's "kid" header.
+#
+# Zero-downtime rotation:
+#   1. with JWT_ACTIVE_KID pinned to the current key, add the new private key to
+#      JWT_KEYS_DIR; it is published in the JWKS and accepted for verification
+#      once workers reload the directory
+#   2. after downstream JWKS caches have refreshed, point JWT_ACTIVE_KID at the new
+#      key (it may only be left unset while the directory holds a single private key,
+#      so a newly added key never starts signing on its own)
+#   3. once tokens signed by the old key have expired, replace its file with the
+#      public key only, or delete it
+#
+# With HS256 (the default) tokens are signed with SECRET_KEY and the JWKS is empty.
+#
+# python-jose (and cryptography behind it) is imported on first use, keeping it off
+# the import path of freshly started workers.
+
+ASYMMETRIC_PREFIXES = ("RS", "ES", "PS")
+
+logger = logging.getLogger(__name__)
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm.startswith(ASYMMETRIC_PREFIXES)
+
+
+class KeySet:
+    def __init__(self, algorithm: str, keys_dir: str, active_kid: str = None, reload_seconds: int = 30):
+        self.algorithm = algorithm
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.reload_seconds = reload_seconds
+        # Readers don't take the lock, so values that belong together are kept in one
+        # tuple and swapped with a single assignment on reload
+        self._signing = (None, None)  # (kid, private key object)
+        self._verification_keys = {}  # kid -> public key object
+        self._jwks = (b'{"keys": []}', "")  # (serialized JWKS, ETag)
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # Snapshot of the key files, used to detect changes without re-parsing PEMs
+    def _scan(self):
+        entries = []
+        for name in sorted(os.listdir(self.keys_dir)):
+            if name.endswith(".pem"):
+                stat = os.stat(os.path.join(self.keys_dir, name))
+                entries.append((name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def _load(self, fingerprint):
+        from jose import jwk
+        private_keys, public_keys = {}, {}
+        for name, _, _ in fingerprint:
+            with open(os.path.join(self.keys_dir, name)) as f:
+                pem = f.read()
+            if name.endswith(".pub.pem"):
+                public_keys[name[:-len(".pub.pem")]] = jwk.construct(pem, self.algorithm)
+            else:
+                key = jwk.construct(pem, self.algorithm)
+                private_keys[name[:-len(".pem")]] = key
+                public_keys[name[:-len(".pem")]] = key.public_key()
+        if not private_keys:
+            raise RuntimeError(f"No private signing keys (*.pem) found in {self.keys_dir}")
+        if self.active_kid:
+            if self.active_kid not in private_keys:
+                raise RuntimeError(f"JWT_ACTIVE_KID {self.active_kid!r} has no private key in {self.keys_dir}")
+            signing_kid = self.active_kid
+        elif len(private_keys) == 1:
+            signing_kid = next(iter(private_keys))
+        else:
+            raise RuntimeError(f"Several private keys in {self.keys_dir}; set JWT_ACTIVE_KID to the one that signs")
+        jwks = {"keys": [dict(key.to_dict(), kid=kid, use="sig") for kid, key in sorted(public_keys.items())]}
+        body = json.dumps(jwks, separators=(",", ":")).encode()
+        self._signing = (signing_kid, private_keys[signing_kid])
+        self._verification_keys = public_keys
+        self._jwks = (body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        self._fingerprint = fingerprint
+
+    # Reload the key directory if it changed, checking at most every reload_seconds.
+    # A directory that fails to load after a good one (e.g. a second private key added
+    # without JWT_ACTIVE_KID) keeps the previous keys in service and is logged.
+    def _refresh(self):
+        now = time.monotonic()
+        if self._fingerprint is not None and now - self._checked_at < self.reload_seconds:
+            return
+        with self._lock:
+            if self._fingerprint is not None and now - self._checked_at < self.reload_seconds:
+                return
+            fingerprint = self._scan()
+            if fingerprint != self._fingerprint:
+                if self._fingerprint is None:
+                    self._load(fingerprint)
+                else:
+                    try:
+                        self._load(fingerprint)
+                    except Exception:
+                        logger.exception("Keeping the previous signing keys; reloading %s failed", self.keys_dir)
+            self._checked_at = now
+
+    # Return (kid, key) for signing new tokens
+    def signing_key(self):
+        self._refresh()
+        return self._signing
+
+    # Return the verification key for a token's kid, or None if unknown
+    def verification_key(self, kid: str):
+        self._refresh()
+        if kid is None and len(self._verification_keys) == 1:
+            return next(iter(self._verification_keys.values()))
+        return self._verification_keys.get(kid)
+
+    # Return the serialized JWKS document and its ETag
+    def jwks(self):
+        self._refresh()
+        return self._jwks
+
+
+_keyset = None
+
+
+# Lazily build the key set for the configured algorithm (None for HS256)
+def get_keyset():
+    global _keyset
+    if _keyset is None and is_asymmetric(settings.ALGORITHM):
+        _keyset = KeySet(settings.ALGORITHM, settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID, settings.JWT_KEYS_RELOAD_SECONDS)
+    return _keyset
+
+
+# Sign claims with the active key
+def encode(claims: dict) -> str:
+    from jose import jwt
+    keyset = get_keyset()
+    if keyset is None:
+        return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    kid, key = keyset.signing_key()
+    return jwt.encode(claims, key, algorithm=settings.ALGORITHM, headers={"kid": kid})
+
+
+# Verify and decode a token with the key named by its kid header
+def decode(token: str) -> dict:
+    from jose import jwt
+    keyset = get_keyset()
+    if keyset is None:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    key = keyset.verification_key(jwt.get_unverified_header(token).get("kid"))
+    if key is None:
+        raise jwt.JWTError("Unknown signing key")
+    return jwt.decode(token, key, algorithms=[settings.ALGORITHM])
+
+
+# Read a token's claims without verifying its signature
+def unverified_claims(token: str) -> dict:
+    from jose import jwt
+    return jwt.get_unverified_claims(token)
+
+
+# Generate a new private key file: python -m app.core.keys --kid 2026-10 [--algorithm RS256]
+def main():
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key in JWT_KEYS_DIR.")
+    parser.add_argument("--kid", default=time.strftime("%Y%m%d%H%M%S"))
+    parser.add_argument("--algorithm", default=settings.ALGORITHM if is_asymmetric(settings.ALGORITHM) else "RS256")
+    parser.add_argument("--dir", default=settings.JWT_KEYS_DIR)
+    args = parser.parse_args()
+
+    if args.algorithm.startswith("ES"):
+        curves = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+        private_key = ec.generate_private_key(curves[args.algorithm])
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    os.makedirs(args.dir, exist_ok=True)
+    path = os.path.join(args.dir, f"{args.kid}.pem")
+    with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+        f.write(pem)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from app.core.config import settings
+from app.core.storage import get_counter_storage
+from app.core.metrics import timed
+
+# Failed-login tracking and account lockout, kept in counter storage so failed
+# attempts don't cost a database write each.
+
+
+def _failures_key(email: str) -> str:
+    return f"login:failures:{email}"
+
+
+def _lockout_key(email: str) -> str:
+    return f"login:lockout:{email}"
+
+
+# Check whether an account is currently locked out
+@timed("lockout_check")
+def is_locked(email: str) -> bool:
+    return get_counter_storage().get(_lockout_key(email)) > 0
+
+
+# Record a failed login, locking the account once the limit is reached
+@timed("lockout_update")
+def register_failed_login(email: str):
+    storage = get_counter_storage()
+    window = settings.LOCKOUT_MINUTES * 60
+    attempts = storage.incr(_failures_key(email), window)
+    if attempts >= settings.LOGIN_MAX_FAILED_ATTEMPTS:
+        storage.incr(_lockout_key(email), window)
+        storage.delete(_failures_key(email))
+
+
+# Clear failed attempts after a successful login. Most logins have none, so check first
+# and only write when there is something to clear.
+@timed("lockout_reset")
+def reset_failed_logins(email: str):
+    storage = get_counter_storage()
+    if storage.get(_failures_key(email)) > 0:
+        storage.delete(_failures_key(email))
@@ -0,0 +1,180 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+from app.core.config import settings
+
+# Minimal Prometheus-style metrics: counters and histograms with labels, rendered
+# in the text exposition format at /metrics. When METRICS_ENABLED is off, the
+# @timed decorator returns functions unwrapped and the request middleware is not
+# mounted, so the disabled path costs nothing per call.
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labelvalues -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    # Return {labelvalues: (sum, count)} for every series
+    def totals(self) -> dict:
+        with self._lock:
+            return {labelvalues: (series[-2], series[-1]) for labelvalues, series in self._series.items()}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labelvalues, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, labelvalues, [f'le="{bound}"'])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, labelvalues, ['le="+Inf"'])
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                labels = _format_labels(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_sum{labels} {series[-2]}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    # Register a callable returning extra exposition lines (e.g. gauges read at scrape time)
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_duration = registry.register(Histogram(
+    "auth_stage_duration_seconds", "Time spent in each stage of an auth request.", ["stage"]))
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"]))
+requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code.", ["method", "route", "status"]))
+
+
+def timed(stage: str):
+    """
+    Decorator recording the wrapped function's duration in auth_stage_duration_seconds.
+    Returns the function unchanged when metrics are disabled.
+    """
+    def decorator(fn):
+        if not settings.METRICS_ENABLED:
+            return fn
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    stage_duration.observe(time.perf_counter() - start, stage)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stage_duration.observe(time.perf_counter() - start, stage)
+        return wrapper
+    return decorator
+
+
+# Pure ASGI middleware recording per-route latency and status counts
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route: the request path for matched static routes (none of the auth
+            # routes take path parameters), the route template otherwise, and a single
+            # "unmatched" label for 404s to keep label cardinality bounded
+            route = scope.get("route")
+            if route is None:
+                path = "unmatched"
+            elif scope.get("path_params"):
+                path = route.path
+            else:
+                path = scope["path"]
+            request_duration.observe(time.perf_counter() - start, scope["method"], path)
+            requests_total.inc(scope["method"], path, status_code)
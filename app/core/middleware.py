@@ -0,0 +1,69 @@
+import json
+from app.core.rate_limit import RateLimiter
+
+# Pure ASGI middlewares. Unlike BaseHTTPMiddleware they don't wrap the response
+# in an extra task and stream; they only touch the http.response.start message.
+
+# Security headers added to every response, precomputed as raw ASGI header tuples
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=63072000; includeSubDomains; preload"),
+    (b"referrer-policy", b"no-referrer"),
+    (b"cache-control", b"no-store"),
+]
+_SECURITY_HEADER_NAMES = {name for name, _ in SECURITY_HEADERS}
+
+
+# Middleware to add security headers to every response that doesn't set them itself
+class SecurityHeadersMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                # Headers the response already set win (e.g. a cacheable Cache-Control)
+                headers = list(message.get("headers", ()))
+                present = {name.lower() for name, _ in headers}
+                if present.isdisjoint(_SECURITY_HEADER_NAMES):
+                    headers.extend(SECURITY_HEADERS)
+                else:
+                    headers.extend(h for h in SECURITY_HEADERS if h[0] not in present)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+_RATE_LIMITED_BODY = json.dumps({"detail": "Rate limit exceeded"}).encode()
+_RATE_LIMITED_START = {
+    "type": "http.response.start",
+    "status": 429,
+    "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(_RATE_LIMITED_BODY)).encode()),
+    ],
+}
+
+
+# Middleware rejecting clients over the rate limit with 429 before the app runs. Counting
+# goes through RateLimiter.ahit, which keeps SQLite and Redis calls off the event loop.
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            client = scope.get("client")
+            if not await self.limiter.ahit(client[0] if client else "127.0.0.1"):
+                await send(dict(_RATE_LIMITED_START))
+                await send({"type": "http.response.body", "body": _RATE_LIMITED_BODY})
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,37 @@
+import time
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.storage import CounterStorage, MemoryStorage, get_counter_storage
+
+# Fixed-window rate limiter on top of counter storage, so the limit is shared
+# by every worker that points at the same backend.
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+# Parse a limit such as "5/second" into (amount, period in seconds)
+def parse_rate(limit: str):
+    amount, _, period = limit.partition("/")
+    return int(amount), _PERIODS[period.strip().rstrip("s")]
+
+
+class RateLimiter:
+    # storage=None uses the shared counter storage, resolved on the first hit
+    def __init__(self, storage: Optional[CounterStorage], limit: str):
+        self.storage = storage
+        self.limit = limit
+        self.amount, self.period = parse_rate(limit)
+
+    # Count a request for key; returns False once the key is over its limit
+    def hit(self, key: str) -> bool:
+        if self.storage is None:
+            self.storage = get_counter_storage()
+        window = int(time.time() // self.period)
+        return self.storage.incr(f"ratelimit:{key}:{window}", self.period) <= self.amount
+
+    # hit() for async callers: in-process memory is counted inline, while SQLite and Redis
+    # (blocking I/O, and connecting on first use) are counted in the threadpool
+    async def ahit(self, key: str) -> bool:
+        if isinstance(self.storage, MemoryStorage):
+            return self.hit(key)
+        return await run_in_threadpool(self.hit, key)
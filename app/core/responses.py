@@ -0,0 +1,75 @@
+import json
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+from app.core.config import settings
+
+# JSON encoding for responses. JSON_RESPONSE_BACKEND picks the encoder:
+#
+#   auto     orjson if installed, else msgspec, else the standard library (default)
+#   orjson   force orjson (optional dependency)
+#   msgspec  force msgspec (optional dependency)
+#   json     the standard library, as Starlette's JSONResponse does
+#
+# The encoder is resolved at startup (resolve_encoder, from the app lifespan) so an
+# unknown backend or a forced one that isn't installed stops the worker instead of
+# failing every response, while the optional libraries stay off the import path.
+# Routes with a response_model are serialized by pydantic unless they return a
+# Response themselves; FastJSONResponse covers the routes without one.
+
+
+# Standard library encoding with the same options as Starlette's JSONResponse
+def _stdlib_dumps(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+# Pick an encoder for a backend name, returning (name, encode function)
+def load_encoder(backend: str):
+    if backend in ("auto", "orjson"):
+        try:
+            import orjson
+            return "orjson", orjson.dumps
+        except ImportError as exc:
+            if backend == "orjson":
+                raise ImportError("JSON_RESPONSE_BACKEND=orjson but orjson is not installed") from exc
+    if backend in ("auto", "msgspec"):
+        try:
+            import msgspec
+            return "msgspec", msgspec.json.Encoder().encode
+        except ImportError as exc:
+            if backend == "msgspec":
+                raise ImportError("JSON_RESPONSE_BACKEND=msgspec but msgspec is not installed") from exc
+    if backend in ("auto", "json"):
+        return "json", _stdlib_dumps
+    raise ValueError(f"Unsupported JSON_RESPONSE_BACKEND: {backend}")
+
+
+_encoder = None
+
+
+# Resolve the configured encoder, raising for an unusable JSON_RESPONSE_BACKEND;
+# returns the backend name
+def resolve_encoder() -> str:
+    global _encoder
+    name, _encoder = load_encoder(settings.JSON_RESPONSE_BACKEND)
+    return name
+
+
+# Encode content as JSON bytes with the configured backend
+def encode_json(content) -> bytes:
+    if _encoder is None:
+        resolve_encoder()
+    return _encoder(content)
+
+
+# Default response class: JSONResponse rendered with the configured encoder
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+# Pre-serialized JSON response for content the route has already validated.
+# Returning a Response skips FastAPI's response_model validation and serialization
+# (for sync routes, also the threadpool hop that validation runs in); the
+# response_model stays on the route for the OpenAPI schema.
+def json_response(content, status_code: int = 200) -> Response:
+    return Response(encode_json(content), status_code=status_code, media_type="application/json")
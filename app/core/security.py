@@ -1,44 +1,119 @@
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from jose import jwt
+from datetime import datetime, timedelta, timezone
+import hashlib
+import time
+import uuid
+from functools import lru_cache
 from app.core.config import settings
+from app.core import keys
 from typing import Optional
+from app.core.metrics import timed
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Build a password hashing context from scheme names and cost parameters.
+# Hashes using a non-default scheme, or a lower bcrypt cost / different argon2
+# parameters than configured, report needs_update and are rehashed on login.
+def build_crypt_context(schemes, bcrypt_rounds: int, argon2_memory_cost: int, argon2_time_cost: int, argon2_parallelism: int):
+    from passlib.context import CryptContext
+    options = {}
+    if "bcrypt" in schemes:
+        options.update(bcrypt__default_rounds=bcrypt_rounds, bcrypt__min_rounds=bcrypt_rounds)
+    if "argon2" in schemes:
+        options.update(
+            argon2__memory_cost=argon2_memory_cost,
+            argon2__time_cost=argon2_time_cost,
+            argon2__parallelism=argon2_parallelism,
+        )
+    return CryptContext(schemes=list(schemes), deprecated="auto", **options)
+
+# Password hashing context configured from settings (bcrypt by default), built on first
+# use so importing the app does not load passlib and its hash backends
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    return build_crypt_context(
+        [scheme.strip() for scheme in settings.PASSWORD_HASH_SCHEMES.split(",") if scheme.strip()],
+        settings.BCRYPT_ROUNDS,
+        settings.ARGON2_MEMORY_COST,
+        settings.ARGON2_TIME_COST,
+        settings.ARGON2_PARALLELISM,
+    )
 
 # Verify a plain password against a hashed password
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+# Verify a password and return (verified, new_hash); new_hash is set when the stored
+# hash uses an outdated scheme or cost and should be replaced
+def verify_and_update_password(plain_password, hashed_password):
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 # Hash a password for storage
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+# Hash of a random password with the current scheme and cost; logins for unknown emails
+# verify against it so they take as long as logins for registered ones
+@lru_cache(maxsize=None)
+def dummy_password_hash():
+    return get_pwd_context().hash(uuid.uuid4().hex)
 
 # Create a JWT access token
+@timed("jwt_encode_access")
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    # Sub-second issue time, compared against the user's tokens_valid_after epoch
+    to_encode.update({"exp": expire, "iat": time.time()})
+    encoded_jwt = keys.encode(to_encode)
     return encoded_jwt
 
 # Create a JWT refresh token (longer expiry)
+@timed("jwt_encode_refresh")
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta is None:
         expires_delta = timedelta(days=7)
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    encoded_jwt = keys.encode(to_encode)
     return encoded_jwt
 
-# Verify and decode a JWT token
+# Create an access/refresh token pair for a subject, plus the refresh token's expiry
+def create_token_pair(subject: str):
+    access_token = create_access_token({"sub": subject})
+    refresh_token = create_refresh_token({"sub": subject})
+    expires_at = datetime.utcfromtimestamp(keys.unverified_claims(refresh_token)["exp"])
+    return access_token, refresh_token, expires_at
+
+# Compute the storage keys of a refresh token: its compact id (the "jti" claim) and
+# its SHA-256 digest. Tokens without a jti fall back to an id derived from the digest.
+# Claims are read unverified here; a stored token only matches if the full digest does.
+def refresh_token_keys(token: str):
+    digest = hashlib.sha256(token.encode()).digest()
+    try:
+        jti = keys.unverified_claims(token).get("jti")
+    except Exception:
+        jti = None
+    if not isinstance(jti, str) or not jti or len(jti) > 32:
+        jti = digest[:16].hex()
+    return jti, digest
+
+# Whether an access token was issued before its user's tokens_valid_after epoch, i.e. its
+# sessions were revoked since. Tokens without an iat claim count as issued before.
+def issued_before(payload: dict, valid_after) -> bool:
+    if valid_after is None:
+        return False
+    if valid_after.tzinfo is None:
+        valid_after = valid_after.replace(tzinfo=timezone.utc)
+    iat = payload.get("iat")
+    return not isinstance(iat, (int, float)) or iat < valid_after.timestamp()
+
+# Verify and decode a JWT token (signature checked with the key named by its kid)
+@timed("jwt_decode")
 def verify_token(token: str):
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = keys.decode(token)
         return payload
     except Exception:
         return None 
\ No newline at end of file
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from app.core.config import settings
+
+# Counter storage shared by the rate limiter and the login lockout. Every
+# backend implements the same atomic increment-with-expiry primitive: the
+# expiry is set when a key is created and the key disappears once it passes.
+#
+#   memory://             per-process, for single-worker deployments and tests
+#   sqlite:///path/to.db  shared file, for several worker processes on one host (default)
+#   redis://host:port/0   shared server, for multi-host deployments
+
+
+class CounterStorage(ABC):
+    """Interface for counter storage backends."""
+
+    @abstractmethod
+    def incr(self, key: str, expiry_seconds: int, amount: int = 1) -> int:
+        """Atomically add amount to key, creating it with the given expiry, and return the new value."""
+
+    @abstractmethod
+    def get(self, key: str) -> int:
+        """Return the current value of key, or 0 if it is missing or expired."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove key."""
+
+
+class MemoryStorage(CounterStorage):
+    def __init__(self):
+        self._counters = {}  # key -> [value, expires_at]
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, expiry_seconds: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None or entry[1] <= now:
+                entry = self._counters[key] = [0, now + expiry_seconds]
+                if len(self._counters) > 10000:
+                    self._purge(now)
+            entry[0] += amount
+            return entry[0]
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None or entry[1] <= time.time():
+                return 0
+            return entry[0]
+
+    def delete(self, key: str):
+        with self._lock:
+            self._counters.pop(key, None)
+
+    # Drop expired keys (caller must hold the lock)
+    def _purge(self, now: float):
+        for key in [k for k, entry in self._counters.items() if entry[1] <= now]:
+            del self._counters[key]
+
+
+class SQLiteStorage(CounterStorage):
+    # How often an increment also deletes every expired row (rate-limit keys are unique
+    # per window, so they are never touched again once their window has passed)
+    PURGE_INTERVAL_SECONDS = 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._next_purge = 0.0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)")
+
+    # One connection per thread; autocommit mode so transactions are explicit. synchronous
+    # is per connection: NORMAL skips the fsync on every commit, and WAL stays consistent
+    # after a crash (only the last few counter updates can be lost)
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def incr(self, key: str, expiry_seconds: int, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._connect()
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent processes serialize
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now >= self._next_purge:
+                self._next_purge = now + self.PURGE_INTERVAL_SECONDS
+                conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+            else:
+                conn.execute("DELETE FROM counters WHERE key = ? AND expires_at <= ?", (key, now))
+            conn.execute(
+                "INSERT INTO counters (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                (key, amount, now + expiry_seconds),
+            )
+            value = conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def get(self, key: str) -> int:
+        row = self._connect().execute(
+            "SELECT value FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def delete(self, key: str):
+        self._connect().execute("DELETE FROM counters WHERE key = ?", (key,))
+
+
+class RedisStorage(CounterStorage):
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str):
+        import redis
+        return cls(redis.Redis.from_url(url))
+
+    def incr(self, key: str, expiry_seconds: int, amount: int = 1) -> int:
+        # MULTI/EXEC: create the key with its expiry only if missing, then increment
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(key, 0, ex=expiry_seconds, nx=True)
+        pipe.incrby(key, amount)
+        return int(pipe.execute()[1])
+
+    def get(self, key: str) -> int:
+        value = self.client.get(key)
+        return int(value) if value is not None else 0
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+
+# Build a storage backend from a URI
+def get_storage(uri: str) -> CounterStorage:
+    if uri.startswith("memory://"):
+        return MemoryStorage()
+    if uri.startswith("sqlite:///"):
+        return SQLiteStorage(uri[len("sqlite:///"):])
+    if uri.startswith("redis://") or uri.startswith("rediss://"):
+        return RedisStorage.from_url(uri)
+    raise ValueError(f"Unsupported counter storage URI: {uri}")
+
+
+_counter_storage = None
+
+
+# Lazily create the shared counter storage used by the rate limiter and login lockout.
+# Per-process memory is refused when several workers are configured: each would keep
+# its own counts, multiplying the rate limit and the lockout attempts by the worker count.
+def get_counter_storage() -> CounterStorage:
+    global _counter_storage
+    if _counter_storage is None:
+        if settings.COUNTER_STORAGE_URI.startswith("memory://") and settings.WEB_CONCURRENCY > 1:
+            raise ValueError("COUNTER_STORAGE_URI=memory:// is per-process; use sqlite:/// or redis:// with several workers")
+        _counter_storage = get_storage(settings.COUNTER_STORAGE_URI)
+    return _counter_storage
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import settings
+
+# Bounded LRU/TTL cache of verified access tokens. Entries are keyed by the
+# SHA-256 digest of the token (the raw token is never kept) and hold the decoded
+# claims plus the resolved user projection. An entry never outlives the token's
+# own "exp" claim.
+
+
+class TokenCache:
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # digest -> (expires_at, subject, claims, user)
+        self._by_subject = {}  # subject -> set of digests
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    # Return (claims, user) for a cached token, or None on a miss
+    def get(self, token: str):
+        if self.maxsize <= 0:
+            return None
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2], entry[3]
+
+    # Cache the decoded claims and user projection for a token
+    def set(self, token: str, claims: dict, user):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        subject = claims.get("sub")
+        key = self._key(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, subject, claims, user)
+            self._by_subject.setdefault(subject, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    # Drop every cached token for a subject (password change, logout)
+    def invalidate_subject(self, subject: str):
+        with self._lock:
+            for key in list(self._by_subject.get(subject, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_subject.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # Caller must hold the lock
+    def _remove(self, key: bytes):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_subject.get(entry[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_subject[entry[1]]
+
+
+# Singleton cache instance
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL_SECONDS)
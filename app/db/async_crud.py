@@ -0,0 +1,125 @@
+import hmac
+from datetime import datetime, timezone
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db import models
+from app.db.replicas import REPLICA_ERRORS, replica_router
+from app.db.crud import rotate_refresh_token_stmt
+from app.core.hashing import get_password_hash_async
+from app.core.security import refresh_token_keys
+from app.core.metrics import timed
+from app.core.email_filter import email_filter
+
+# Async counterparts of the functions in app.db.crud
+
+# Return the first entity a select yields, from a healthy read replica when replica=True
+# (see app.db.crud.read_first)
+async def read_first(db: AsyncSession, stmt, replica: bool = False):
+    chosen = replica_router.pick() if replica else None
+    if chosen is not None:
+        try:
+            result = await db.execute(stmt, bind_arguments={"bind": chosen.async_engine.sync_engine})
+            row = result.scalars().first()
+            if row is not None:
+                return row
+        except REPLICA_ERRORS as exc:
+            await db.rollback()
+            replica_router.mark_down(chosen, exc)
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+# Get a user by email (from a read replica when replica=True, unless the user changed
+# recently; see app.db.crud.get_user_by_email)
+@timed("db_get_user_by_email")
+async def get_user_by_email(db: AsyncSession, email: str, replica: bool = False):
+    if replica and replica_router.enabled and await run_in_threadpool(replica_router.recently_changed, email):
+        replica = False
+    return await read_first(db, select(models.User).where(models.User.email == email).limit(1), replica)
+
+# Get a user by id
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
+# Create a new user with hashed password
+async def create_user(db: AsyncSession, email: str, password: str):
+    return await insert_user(db, email, await get_password_hash_async(password))
+
+# Insert a user whose password is already hashed
+@timed("db_insert_user")
+async def insert_user(db: AsyncSession, email: str, hashed_password: str):
+    db_user = models.User(email=email, hashed_password=hashed_password)
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    email_filter.add(email)
+    await run_in_threadpool(email_filter.publish)
+    return db_user
+
+# Replace a user's stored password hash
+@timed("db_update_password_hash")
+async def update_password_hash(db: AsyncSession, user, hashed_password: str):
+    user.hashed_password = hashed_password
+    await db.commit()
+
+# Create a new refresh token for a user (only its id and digest are stored)
+@timed("db_insert_refresh_token")
+async def create_refresh_token(db: AsyncSession, user_id: int, token: str, expires_at):
+    jti, token_hash = refresh_token_keys(token)
+    db_token = models.RefreshToken(user_id=user_id, jti=jti, token_hash=token_hash, expires_at=expires_at)
+    db.add(db_token)
+    await db.commit()
+    await db.refresh(db_token)
+    return db_token
+
+# Get a refresh token by its string value: look up by jti, then compare digests
+# (from a read replica when replica=True; deleting or rotating callers keep the primary)
+async def get_refresh_token(db: AsyncSession, token: str, replica: bool = False):
+    jti, token_hash = refresh_token_keys(token)
+    db_token = await read_first(db, select(models.RefreshToken).where(models.RefreshToken.jti == jti).limit(1), replica)
+    if db_token is None or not hmac.compare_digest(db_token.token_hash, token_hash):
+        return None
+    return db_token
+
+# Rotate a refresh token in one round trip and one transaction; returns the user id or None
+@timed("db_rotate_refresh_token")
+async def rotate_refresh_token(db: AsyncSession, old_token: str, new_token: str, expires_at, email: str):
+    user_id = (await db.execute(rotate_refresh_token_stmt(old_token, new_token, expires_at, email))).scalar()
+    await db.commit()
+    return user_id
+
+# Delete a refresh token (revoke)
+@timed("db_delete_refresh_token")
+async def delete_refresh_token(db: AsyncSession, token: str):
+    db_token = await get_refresh_token(db, token)
+    if db_token:
+        await db.delete(db_token)
+        await db.commit()
+
+# List a user's unexpired refresh tokens (one per session), newest first
+async def get_user_sessions(db: AsyncSession, user_id: int):
+    result = await db.execute(
+        select(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user_id, models.RefreshToken.expires_at > datetime.utcnow())
+        .order_by(models.RefreshToken.created_at.desc(), models.RefreshToken.id.desc())
+    )
+    return result.scalars().all()
+
+# Delete one of a user's refresh tokens by its id; returns whether it existed
+@timed("db_delete_refresh_token")
+async def delete_user_session(db: AsyncSession, user_id: int, session_id: int) -> bool:
+    result = await db.execute(
+        delete(models.RefreshToken).where(models.RefreshToken.id == session_id, models.RefreshToken.user_id == user_id)
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+# Revoke all of a user's sessions in one transaction: a single DELETE on the user_id index,
+# and a move of the user's tokens_valid_after epoch so outstanding access tokens are rejected.
+# Commits any pending changes to the user as well. Returns the number of refresh tokens deleted.
+@timed("db_revoke_user_sessions")
+async def revoke_user_sessions(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(delete(models.RefreshToken).where(models.RefreshToken.user_id == user_id))
+    await db.execute(update(models.User).where(models.User.id == user_id).values(tokens_valid_after=datetime.now(timezone.utc)))
+    await db.commit()
+    return result.rowcount
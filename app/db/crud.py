@@ -1,35 +1,154 @@
+import hmac
+from datetime import datetime, timezone
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
 from app.db import models
-from app.core.security import get_password_hash, verify_password
+from app.db.replicas import REPLICA_ERRORS, replica_router
+from app.core.security import refresh_token_keys
+from app.core.hashing import get_password_hash
+from app.core.metrics import timed
+from app.core.email_filter import email_filter
 
-# Get a user by email
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+# Return the first entity a select yields. With replica=True it is read from a healthy
+# read replica when one is configured: a replica that errors is taken out of rotation,
+# and a row missing on the replica (which may lag behind) is looked up on the primary.
+# Only use replica=True for reads that come first in their session, since a failed
+# replica read rolls the session back.
+def read_first(db: Session, stmt, replica: bool = False):
+    chosen = replica_router.pick() if replica else None
+    if chosen is not None:
+        try:
+            row = db.execute(stmt, bind_arguments={"bind": chosen.engine}).scalars().first()
+            if row is not None:
+                return row
+        except REPLICA_ERRORS as exc:
+            db.rollback()
+            replica_router.mark_down(chosen, exc)
+    return db.execute(stmt).scalars().first()
+
+# Get a user by email (from a read replica when replica=True, unless the user's password
+# or sessions changed recently and a replica may still have the old row)
+@timed("db_get_user_by_email")
+def get_user_by_email(db: Session, email: str, replica: bool = False):
+    if replica and replica_router.enabled and replica_router.recently_changed(email):
+        replica = False
+    return read_first(db, select(models.User).where(models.User.email == email).limit(1), replica)
+
+# Get a user by id
+def get_user_by_id(db: Session, user_id: int):
+    return db.get(models.User, user_id)
 
 # Create a new user with hashed password
 def create_user(db: Session, email: str, password: str):
-    hashed_password = get_password_hash(password)
+    return insert_user(db, email, get_password_hash(password))
+
+# Insert a user whose password is already hashed
+@timed("db_insert_user")
+def insert_user(db: Session, email: str, hashed_password: str):
     db_user = models.User(email=email, hashed_password=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    email_filter.add(email)
+    email_filter.publish()
     return db_user
 
-# Create a new refresh token for a user
+# Replace a user's stored password hash
+@timed("db_update_password_hash")
+def update_password_hash(db: Session, user, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+
+# Create a new refresh token for a user (only its id and digest are stored)
+@timed("db_insert_refresh_token")
 def create_refresh_token(db: Session, user_id: int, token: str, expires_at):
-    db_token = models.RefreshToken(user_id=user_id, token=token, expires_at=expires_at)
+    jti, token_hash = refresh_token_keys(token)
+    db_token = models.RefreshToken(user_id=user_id, jti=jti, token_hash=token_hash, expires_at=expires_at)
     db.add(db_token)
     db.commit()
     db.refresh(db_token)
     return db_token
 
-# Get a refresh token by its string value
-def get_refresh_token(db: Session, token: str):
-    return db.query(models.RefreshToken).filter(models.RefreshToken.token == token).first()
+# Get a refresh token by its string value: look up by jti, then compare digests
+# (from a read replica when replica=True; deleting or rotating callers keep the primary)
+def get_refresh_token(db: Session, token: str, replica: bool = False):
+    jti, token_hash = refresh_token_keys(token)
+    db_token = read_first(db, select(models.RefreshToken).where(models.RefreshToken.jti == jti).limit(1), replica)
+    if db_token is None or not hmac.compare_digest(db_token.token_hash, token_hash):
+        return None
+    return db_token
+
+# Build the single-statement rotation: swap an unexpired refresh token for a new one in
+# place, provided its user still exists, returning the user id (or nothing if no row matched)
+def rotate_refresh_token_stmt(old_token: str, new_token: str, expires_at, email: str):
+    old_jti, old_hash = refresh_token_keys(old_token)
+    new_jti, new_hash = refresh_token_keys(new_token)
+    user_exists = select(models.User.id).where(models.User.id == models.RefreshToken.user_id, models.User.email == email).exists()
+    return (
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.jti == old_jti,
+            models.RefreshToken.token_hash == old_hash,
+            models.RefreshToken.expires_at > datetime.utcnow(),
+            user_exists,
+        )
+        .values(jti=new_jti, token_hash=new_hash, expires_at=expires_at, created_at=func.now())
+        .returning(models.RefreshToken.user_id)
+    )
+
+# Rotate a refresh token in one round trip and one transaction; returns the user id or None.
+# Concurrent rotations of the same token race on the row and only one can match.
+@timed("db_rotate_refresh_token")
+def rotate_refresh_token(db: Session, old_token: str, new_token: str, expires_at, email: str):
+    user_id = db.execute(rotate_refresh_token_stmt(old_token, new_token, expires_at, email)).scalar()
+    db.commit()
+    return user_id
 
 # Delete a refresh token (revoke)
+@timed("db_delete_refresh_token")
 def delete_refresh_token(db: Session, token: str):
     db_token = get_refresh_token(db, token)
     if db_token:
         db.delete(db_token)
-        db.commit() 
\ No newline at end of file
+        db.commit()
+
+# Delete up to batch_size refresh tokens that expired before now; returns the number deleted.
+# Bounded batches keep each transaction (and its locks) short.
+def delete_expired_refresh_tokens(db: Session, now: datetime, batch_size: int):
+    expired_ids = (
+        select(models.RefreshToken.id)
+        .where(models.RefreshToken.expires_at < now)
+        .order_by(models.RefreshToken.expires_at)
+        .limit(batch_size)
+    )
+    result = db.execute(delete(models.RefreshToken).where(models.RefreshToken.id.in_(expired_ids)))
+    db.commit()
+    return result.rowcount
+
+# List a user's unexpired refresh tokens (one per session), newest first
+def get_user_sessions(db: Session, user_id: int):
+    return (
+        db.query(models.RefreshToken)
+        .filter(models.RefreshToken.user_id == user_id, models.RefreshToken.expires_at > datetime.utcnow())
+        .order_by(models.RefreshToken.created_at.desc(), models.RefreshToken.id.desc())
+        .all()
+    )
+
+# Delete one of a user's refresh tokens by its id; returns whether it existed
+@timed("db_delete_refresh_token")
+def delete_user_session(db: Session, user_id: int, session_id: int) -> bool:
+    result = db.execute(
+        delete(models.RefreshToken).where(models.RefreshToken.id == session_id, models.RefreshToken.user_id == user_id)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+# Revoke all of a user's sessions in one transaction: a single DELETE on the user_id index,
+# and a move of the user's tokens_valid_after epoch so outstanding access tokens are rejected.
+# Commits any pending changes to the user as well. Returns the number of refresh tokens deleted.
+@timed("db_revoke_user_sessions")
+def revoke_user_sessions(db: Session, user_id: int) -> int:
+    result = db.execute(delete(models.RefreshToken).where(models.RefreshToken.user_id == user_id))
+    db.execute(update(models.User).where(models.User.id == user_id).values(tokens_valid_after=datetime.now(timezone.utc)))
+    db.commit()
+    return result.rowcount
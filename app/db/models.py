@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, func
 from sqlalchemy.orm import mapped_column
 from app.db.base import Base
 
@@ -9,14 +9,15 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)  # User email
     hashed_password = Column(String, nullable=False)  # Hashed password
     created_at = Column(DateTime(timezone=True), server_default=func.now())  # Registration time
-    failed_login_attempts = mapped_column(Integer, default=0)  # Failed login attempts counter
-    lockout_until = mapped_column(DateTime(timezone=True), nullable=True)  # Lockout expiry timestamp
+    tokens_valid_after = mapped_column(DateTime(timezone=True), nullable=True)  # Access tokens issued before this are revoked
+    last_login_at = mapped_column(DateTime(timezone=True), nullable=True)  # Last successful login (written in batches)
 
 # Model for storing refresh tokens
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
     id = Column(Integer, primary_key=True, index=True)  # Unique token ID
     user_id = Column(Integer, nullable=False, index=True)  # Associated user ID
-    token = Column(String, unique=True, nullable=False, index=True)  # The refresh token string
+    jti = Column(String(32), unique=True, nullable=False, index=True)  # Compact token id (jti claim) used for lookups
+    token_hash = Column(LargeBinary(32), nullable=False)  # SHA-256 digest of the refresh token
     created_at = Column(DateTime(timezone=True), server_default=func.now())  # Token creation time
-    expires_at = Column(DateTime(timezone=True), nullable=False)  # Token expiry time 
\ No newline at end of file
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # Token expiry time (indexed for the expiry reaper) 
\ No newline at end of file
@@ -0,0 +1,192 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy import exc as sa_exc
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+from app.core.storage import get_counter_storage
+from app.db.session import engine_kwargs, get_async_database_url
+from app.db.pool import InstrumentedAsyncQueuePool
+
+logger = logging.getLogger(__name__)
+
+# Errors from a replica read that take the replica out of rotation and retry on the
+# primary: driver errors, a replica pool checkout timeout, and connect-level failures
+REPLICA_ERRORS = (sa_exc.DBAPIError, sa_exc.TimeoutError, OSError)
+
+# Read replicas for read-only auth queries. Reads that are safe to serve from a replica
+# (crud functions called with replica=True) go to a healthy replica, round-robin; all
+# writes and every other read stay on the primary. A replica is taken out of rotation
+# when a read on it fails or a health check fails (or, on Postgres with
+# DB_REPLICA_MAX_LAG_SECONDS set, when it lags too far behind), and put back by the
+# periodic health check once it answers again. With no healthy replica reads fall back
+# to the primary.
+#
+# Login and token checks read the password hash and the revocation epoch, so a lagging
+# replica must not serve a user whose password or sessions just changed. Those changes
+# mark the user in the shared counter storage for DB_REPLICA_MAX_LAG_SECONDS plus one
+# health-check interval (how far behind a replica that passed its last lag check can
+# be), and marked users are read from the primary. Postgres replicas over the lag bound
+# are out of rotation, and stay out at startup until their first lag check.
+
+# Replication lag of a Postgres standby in seconds (0 on a primary)
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+)
+
+
+# Short description of a database error (the driver's message without SQLAlchemy's footer)
+def _describe(error: Exception) -> str:
+    error = getattr(error, "orig", None) or error
+    return f"{type(error).__name__}: {error}"
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True
+        self.reads = 0
+        self.failures = 0
+        self.lag_seconds = None
+        self.last_error = None
+        self.checked_at = None
+        self._engine = None
+        self._async_engine = None
+        self._lock = threading.Lock()
+
+    # Lazily create the sync engine for this replica
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = create_engine(self.url, **engine_kwargs(self.url))
+        return self._engine
+
+    # Lazily create the async engine for this replica
+    @property
+    def async_engine(self):
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    from sqlalchemy.ext.asyncio import create_async_engine
+                    async_url = get_async_database_url(self.url)
+                    self._async_engine = create_async_engine(async_url, **engine_kwargs(async_url, InstrumentedAsyncQueuePool))
+        return self._async_engine
+
+    def stats(self) -> dict:
+        return {
+            "url": make_url(self.url).render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "reads": self.reads,
+            "failures": self.failures,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaRouter:
+    def __init__(self, urls, max_lag_seconds: float = 0):
+        self.max_lag_seconds = max_lag_seconds
+        self.fallbacks = 0
+        self.configure(urls)
+
+    # Replace the set of replicas (an empty list routes everything to the primary)
+    def configure(self, urls):
+        self.replicas = [Replica(url) for url in urls]
+        for replica in self.replicas:
+            replica.healthy = not self._checks_lag(replica)
+        self._next = itertools.count()
+
+    # Whether a replica's lag is measured (and bounded) by the health check
+    def _checks_lag(self, replica: Replica) -> bool:
+        return self.max_lag_seconds > 0 and make_url(replica.url).get_backend_name() == "postgresql"
+
+    # How long a user stays on the primary after a password or session change
+    @property
+    def changed_ttl_seconds(self) -> int:
+        return int(self.max_lag_seconds + settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS) + 1
+
+    # Read a user from the primary until replicas have caught up with a change to their
+    # password hash or revocation epoch (call before committing the change)
+    def mark_changed(self, email: str):
+        if self.enabled:
+            get_counter_storage().incr(f"replica:changed:{email}", self.changed_ttl_seconds)
+
+    # Whether a user changed recently enough that replicas may still have the old row
+    def recently_changed(self, email: str) -> bool:
+        return get_counter_storage().get(f"replica:changed:{email}") > 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    # Next healthy replica, round-robin; None (read from the primary) if there is none
+    def pick(self):
+        replicas = self.replicas
+        if not replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(replicas)):
+            replica = replicas[(start + offset) % len(replicas)]
+            if replica.healthy:
+                replica.reads += 1
+                return replica
+        self.fallbacks += 1
+        return None
+
+    # Take a replica out of rotation after a failed read
+    def mark_down(self, replica: Replica, error: Exception):
+        replica.healthy = False
+        replica.failures += 1
+        replica.last_error = _describe(error)
+        self.fallbacks += 1
+        logger.warning("Read replica %s marked down: %s", replica.stats()["url"], replica.last_error)
+
+    # Probe every replica, updating its health (and lag on Postgres)
+    def check(self):
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    if self._checks_lag(replica):
+                        replica.lag_seconds = float(connection.execute(POSTGRES_LAG_SQL).scalar())
+                    else:
+                        connection.execute(text("SELECT 1"))
+                lagging = self.max_lag_seconds > 0 and (replica.lag_seconds or 0) > self.max_lag_seconds
+                if lagging:
+                    replica.last_error = f"lag {replica.lag_seconds:.1f}s exceeds {self.max_lag_seconds}s"
+                elif not replica.healthy:
+                    logger.info("Read replica %s back in rotation", replica.stats()["url"])
+                replica.healthy = not lagging
+            except Exception as exc:
+                if replica.healthy:
+                    self.mark_down(replica, exc)
+                else:
+                    replica.last_error = _describe(exc)
+            replica.checked_at = time.time()
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            "healthy": sum(replica.healthy for replica in self.replicas),
+            "fallbacks": self.fallbacks,
+        }
+
+
+# Periodically health-check the replicas until cancelled
+async def run_health_checks(interval_seconds: float):
+    while True:
+        await run_in_threadpool(replica_router.check)
+        await asyncio.sleep(interval_seconds)
+
+
+# Replicas configured from DB_REPLICA_URLS (comma-separated)
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()],
+    settings.DB_REPLICA_MAX_LAG_SECONDS,
+)
@@ -1,8 +1,74 @@
+import threading
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
 
-# Create the SQLAlchemy engine using the database URL
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URL)
-# Create a session factory for database sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) 
\ No newline at end of file
+# Engine arguments for a database URL: a tuned, instrumented connection pool.
+# In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+def engine_kwargs(url: str, pool_class=InstrumentedQueuePool) -> dict:
+    parsed = make_url(url)
+    kwargs = {}
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite connections are shared across the threadpool in local runs
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            return kwargs
+    kwargs.update(
+        poolclass=pool_class,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return kwargs
+
+# The engine is built on first use rather than at import, so importing the app (and
+# forking workers) stays cheap and does not need the database driver until a session
+# actually runs a query
+engine = None
+_engine_lock = threading.Lock()
+
+# Lazily create the SQLAlchemy engine using the database URL
+def get_engine():
+    global engine
+    if engine is None:
+        with _engine_lock:
+            if engine is None:
+                engine = create_engine(settings.SQLALCHEMY_DATABASE_URL, **engine_kwargs(settings.SQLALCHEMY_DATABASE_URL))
+    return engine
+
+# Session bound to the lazily created engine, unless a statement names its own bind
+# (as replica reads do)
+class LazyEngineSession(Session):
+    def get_bind(self, mapper=None, bind=None, **kw):
+        return bind or get_engine()
+
+# Create a session factory for database sessions. Sessions are lazy: a connection is
+# only checked out of the pool on the first query, so requests rejected before
+# touching the database (e.g. invalid or cached tokens) never hold one.
+SessionLocal = sessionmaker(class_=LazyEngineSession, autocommit=False, autoflush=False)
+
+# Map a sync database URL to its async driver (asyncpg for Postgres, aiosqlite for SQLite)
+def get_async_database_url(url: str) -> str:
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+# The async engine is only built when async mode is used, so its driver is optional otherwise
+async_engine = None
+AsyncSessionLocal = None
+
+# Lazily create the async engine and session factory
+def get_async_sessionmaker():
+    global async_engine, AsyncSessionLocal
+    if AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+        async_url = get_async_database_url(settings.SQLALCHEMY_DATABASE_URL)
+        async_engine = create_async_engine(async_url, **engine_kwargs(async_url, InstrumentedAsyncQueuePool))
+        AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    return AsyncSessionLocal
@@ -1,19 +1,70 @@
 # Import FastAPI framework
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-# Import the authentication router
-from app.api.routes import auth
+# Import the routers (the authentication router is picked below)
+from app.api.routes import admin, jwks, monitoring
 # Import CORS middleware
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from fastapi.responses import JSONResponse
 from fastapi.requests import Request
+from sqlalchemy import exc as sa_exc
+from app.core import hashing
+from app.core.config import settings
+from app.core.email_filter import email_filter
+from app.core.middleware import SecurityHeadersMiddleware, RateLimitMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.responses import FastJSONResponse, resolve_encoder
+from app.core.rate_limit import RateLimiter
+from app.db.replicas import replica_router, run_health_checks
+from app.db.session import SessionLocal
+from app.services import last_login, prewarm, token_reaper
+from starlette.concurrency import run_in_threadpool
+import asyncio
 
-# Create the FastAPI application instance
-app = FastAPI()
+# Startup: resolve the JSON encoder (failing fast on a bad JSON_RESPONSE_BACKEND),
+# optionally prewarm, build the email filter and start the expired refresh token
+# reaper, read replica health checks and last-login writer before the worker reports
+# ready. Shutdown: stop the background tasks, flush buffered last-login writes and stop
+# the password hashing workers.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    resolve_encoder()
+    if settings.PREWARM:
+        await prewarm.prewarm()
+    if settings.EMAIL_FILTER_ENABLED:
+        await run_in_threadpool(email_filter.build, SessionLocal)
+    reaper = None
+    if settings.REFRESH_TOKEN_REAPER_INTERVAL_SECONDS > 0:
+        reaper = asyncio.create_task(token_reaper.run_reaper(settings.REFRESH_TOKEN_REAPER_INTERVAL_SECONDS))
+    app.state.token_reaper = reaper
+    health_checks = None
+    if replica_router.enabled:
+        health_checks = asyncio.create_task(run_health_checks(settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS))
+    login_writer = None
+    if settings.LAST_LOGIN_TRACKING:
+        login_writer = asyncio.create_task(last_login.run_writer(settings.LAST_LOGIN_FLUSH_SECONDS))
+    yield
+    for task in (reaper, health_checks, login_writer):
+        if task is not None:
+            task.cancel()
+    # Write out logins still buffered
+    if login_writer is not None:
+        await run_in_threadpool(last_login.last_login_writer.flush)
+    hashing.shutdown()
+
+# Create the FastAPI application instance; responses without a response_model are
+# encoded with the configured JSON backend
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Set up the rate limiter: requests per IP (RATE_LIMIT, default 5/second), counted in the
+# shared counter storage (connected on the first request) so the limit holds across
+# worker processes
+limiter = RateLimiter(None, settings.RATE_LIMIT)
+app.state.limiter = limiter
+
+# Middlewares run outermost-last-added. Rate limiting is innermost of the three below so
+# 429 responses still carry the CORS and security headers.
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
 
 # Allow all origins for demonstration; restrict in production!
 app.add_middleware(
@@ -24,29 +75,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middleware to add security headers to every response
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response: Response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains; preload"
-        response.headers["Referrer-Policy"] = "no-referrer"
-        response.headers["Cache-Control"] = "no-store"
-        return response
-
+# Pure ASGI middleware adding security headers to every response
 app.add_middleware(SecurityHeadersMiddleware)
+# Per-route latency and status metrics, outermost so every response is counted
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
-# Set up the rate limiter: 5 requests per second per IP (customize as needed)
-limiter = Limiter(key_func=get_remote_address, default_limits=["5/second"])
-app.state.limiter = limiter
+# Fail fast with 503 when the password hashing pool is saturated
+@app.exception_handler(hashing.HashingPoolSaturated)
+def hashing_saturated_handler(request: Request, exc: hashing.HashingPoolSaturated):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, try again later"}, headers={"Retry-After": "1"})
+
+# Fail fast with 503 when no database connection could be checked out in DB_POOL_TIMEOUT
+@app.exception_handler(sa_exc.TimeoutError)
+def db_pool_timeout_handler(request: Request, exc: sa_exc.TimeoutError):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, try again later"}, headers={"Retry-After": "1"})
+
+# Include the authentication router under the /auth prefix (async variant when ASYNC_DB is set);
+# only the variant in use is imported
+if settings.ASYNC_DB:
+    from app.api.routes import auth_async as auth
+else:
+    from app.api.routes import auth
+app.include_router(auth.router, prefix="/auth", tags=["auth"])
 
-@app.exception_handler(RateLimitExceeded)
-def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+# Include admin endpoints (disabled unless ADMIN_API_KEY is set)
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
-app.middleware("http")(limiter.middleware)
+# Include the JWKS endpoint for downstream token verification
+app.include_router(jwks.router, tags=["auth"])
 
-# Include the authentication router under the /auth prefix
-app.include_router(auth.router, prefix="/auth", tags=["auth"]) 
\ No newline at end of file
+# Include monitoring endpoints and the Prometheus /metrics endpoint
+app.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
+app.include_router(monitoring.metrics_router, tags=["monitoring"])
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, EmailStr
 
 # Schema for user registration
@@ -31,4 +32,13 @@ class RefreshTokenRequest(BaseModel):
 # Schema for change password request
 class ChangePasswordRequest(BaseModel):
     old_password: str
-    new_password: str 
\ No newline at end of file
+    new_password: str 
+
+# Schema for a session (one refresh token) in session listings
+class SessionResponse(BaseModel):
+    id: int
+    created_at: datetime
+    expires_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,120 @@
+# Async service functions for user authentication and management
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db import async_crud
+from app.core.security import create_token_pair, verify_token
+from app.core.hashing import verify_password_async, verify_and_update_password_async, get_password_hash_async
+from app.core.token_cache import token_cache
+from app.core.email_filter import email_filter
+from app.core.security import dummy_password_hash
+from app.db.replicas import replica_router
+from app.db.session import SessionLocal
+from app.core import lockout
+from app.core.metrics import timed
+from app.core.config import settings
+from app.services.last_login import last_login_writer
+
+
+@timed("authenticate_user")
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    """
+    Authenticate a user by email and password.
+    Handles account lockout after multiple failed attempts.
+    Resets counters on success, and records the login time (written in batches).
+    Failed-attempt and lockout counters live in counter storage, not the users table.
+    Rehashes the password when the stored hash's scheme or cost is outdated.
+    The user lookup may be served by a read replica; the lockout state and any
+    rehash are written through counter storage and the primary.
+    Emails the email filter knows are unregistered skip the user lookup; unknown
+    emails still pay for one password verification so they are not distinguishable by timing.
+    """
+    # Counter storage calls block (SQLite, Redis), so they run in the threadpool
+    if await run_in_threadpool(lockout.is_locked, email):
+        return None  # Account is locked
+    if not (email_filter.might_contain(email) or await run_in_threadpool(email_filter.recheck, email, SessionLocal)):
+        await verify_password_async(password, dummy_password_hash())
+        return None
+    user = await async_crud.get_user_by_email(db, email, replica=True)
+    if not user:
+        await verify_password_async(password, dummy_password_hash())
+        return None
+    verified, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not verified:
+        await run_in_threadpool(lockout.register_failed_login, email)
+        return None
+    # Opportunistically upgrade hashes made with an outdated scheme or cost
+    if new_hash:
+        await async_crud.update_password_hash(db, user, new_hash)
+    # Success: reset counters (only written when there were failures) and record the
+    # login for the batched last-login writer
+    await run_in_threadpool(lockout.reset_failed_logins, email)
+    if settings.LAST_LOGIN_TRACKING:
+        last_login_writer.record(user)
+    return user
+
+
+@timed("issue_tokens")
+async def issue_tokens(db: AsyncSession, user):
+    """
+    Issue a new access token and refresh token for a user.
+    Stores the refresh token in the database.
+    """
+    access_token, refresh_token, expires_at = create_token_pair(user.email)
+    await async_crud.create_refresh_token(db, user.id, refresh_token, expires_at)
+    return access_token, refresh_token
+
+
+@timed("rotate_refresh_token")
+async def validate_and_rotate_refresh_token(db: AsyncSession, refresh_token: str):
+    """
+    Validate a refresh token, rotate it (replace old with new), and return new tokens.
+    The swap is a single UPDATE ... RETURNING in one transaction, so reusing the
+    same refresh token concurrently succeeds at most once.
+    """
+    payload = verify_token(refresh_token)
+    if not payload or "sub" not in payload:
+        return None, None
+    access_token, new_refresh_token, expires_at = create_token_pair(payload["sub"])
+    user_id = await async_crud.rotate_refresh_token(db, refresh_token, new_refresh_token, expires_at, payload["sub"])
+    if user_id is None:
+        return None, None
+    return access_token, new_refresh_token
+
+
+@timed("change_password")
+async def change_user_password(db: AsyncSession, user, old_password: str, new_password: str):
+    """
+    Change the user's password after verifying the old password.
+    Revokes all of the user's sessions, including outstanding access tokens,
+    in the same transaction.
+    Returns True on success, False if old password is incorrect.
+    """
+    if not await verify_password_async(old_password, user.hashed_password):
+        return False
+    user.hashed_password = await get_password_hash_async(new_password)
+    await run_in_threadpool(replica_router.mark_changed, user.email)
+    await async_crud.revoke_user_sessions(db, user.id)
+    token_cache.invalidate_subject(user.email)
+    return True
+
+
+@timed("revoke_sessions")
+async def revoke_user_sessions(db: AsyncSession, user_id: int, email: str):
+    """
+    Revoke every session of a user: delete all their refresh tokens and reject
+    access tokens issued so far. Returns the number of refresh tokens deleted.
+    """
+    await run_in_threadpool(replica_router.mark_changed, email)
+    revoked = await async_crud.revoke_user_sessions(db, user_id)
+    token_cache.invalidate_subject(email)
+    return revoked
+
+
+async def revoke_refresh_token(db: AsyncSession, refresh_token: str):
+    """
+    Revoke (delete) a refresh token and drop cached access tokens for its user.
+    """
+    await async_crud.delete_refresh_token(db, refresh_token)
+    payload = verify_token(refresh_token)
+    if payload and "sub" in payload:
+        token_cache.invalidate_subject(payload["sub"])
@@ -0,0 +1,208 @@
+# Bulk user import/export: streams CSV or JSONL records, hashes passwords in
+# parallel in the shared password hashing pool, deduplicates against existing emails
+# with one query per batch and inserts each batch with a single executemany.
+import argparse
+import csv
+import io
+import json
+import sys
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core import hashing, security
+from app.core.config import settings
+from app.core.email_filter import email_filter
+from app.db import models
+from app.db.session import SessionLocal
+
+FORMATS = ("csv", "jsonl")
+
+_email_adapter = TypeAdapter(EmailStr)
+
+
+def iter_records(lines, fmt: str):
+    """
+    Yield user records (dicts with "email" and "password" or "hashed_password")
+    from an iterable of text lines in CSV (with a header row) or JSONL format.
+    JSONL lines that aren't valid JSON are yielded as None (counted as invalid).
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+    elif fmt == "jsonl":
+        for line in lines:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _chunks(records, size: int):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Validate and normalize an email exactly as the API's EmailStr fields do (lowercased
+# domain), so imported users log in and register under the same address; None if invalid
+def _normalize_email(email):
+    if not isinstance(email, str):
+        return None
+    try:
+        return _email_adapter.validate_python(email.strip())
+    except ValidationError:
+        return None
+
+
+# Whether a pre-hashed password is a complete hash of a configured scheme; identify()
+# only checks the prefix, and a truncated hash would make every login for the user fail
+def _valid_hash(hashed: str) -> bool:
+    ctx = security.get_pwd_context()
+    try:
+        scheme = ctx.identify(hashed)
+        return bool(scheme) and ctx.handler(scheme).from_string(hashed) is not None
+    except (ValueError, TypeError):
+        return False
+
+
+def _import_batch(db: Session, batch, stats: dict):
+    # Normalize, validate and drop duplicates within the batch
+    rows = {}
+    for record in batch:
+        if not isinstance(record, dict):
+            stats["invalid"] += 1
+            continue
+        email = _normalize_email(record.get("email"))
+        password = record.get("password") or None
+        hashed = record.get("hashed_password") or None
+        if not isinstance(password, (str, type(None))) or not isinstance(hashed, (str, type(None))):
+            stats["invalid"] += 1
+            continue
+        if not email or not (password or (hashed and _valid_hash(hashed))):
+            stats["invalid"] += 1
+            continue
+        if email in rows:
+            stats["duplicate"] += 1
+            continue
+        rows[email] = (password, hashed)
+
+    # One set-based query for emails that already exist
+    if rows:
+        existing = set(db.execute(select(models.User.email).where(models.User.email.in_(list(rows)))).scalars())
+        for email in existing:
+            del rows[email]
+        stats["existing"] += len(existing)
+    if not rows:
+        return
+
+    # Hash plain passwords in parallel; pre-hashed values are stored as-is
+    emails = [email for email, (password, hashed) in rows.items() if not hashed]
+    hashes = dict(zip(emails, hashing.hash_passwords([rows[email][0] for email in emails])))
+    values = [{"email": email, "hashed_password": hashed or hashes[email]} for email, (_, hashed) in rows.items()]
+
+    try:
+        db.execute(insert(models.User), values)
+        db.commit()
+    except IntegrityError:
+        # A concurrent registration took one of the emails: recheck and insert the rest
+        db.rollback()
+        existing = set(db.execute(select(models.User.email).where(models.User.email.in_([v["email"] for v in values]))).scalars())
+        values = [v for v in values if v["email"] not in existing]
+        stats["existing"] += len(existing)
+        if values:
+            db.execute(insert(models.User), values)
+            db.commit()
+    for value in values:
+        email_filter.add(value["email"])
+    email_filter.publish()
+    stats["imported"] += len(values)
+
+
+def import_users(db: Session, records, batch_size: int = None):
+    """
+    Import users from an iterable of records in batches.
+    Returns counts of imported, existing (already registered), duplicate
+    (repeated in the input) and invalid records.
+    """
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+    stats = {"imported": 0, "existing": 0, "duplicate": 0, "invalid": 0}
+    for batch in _chunks(records, batch_size):
+        _import_batch(db, batch, stats)
+    return stats
+
+
+def export_users(db: Session, fmt: str = "jsonl", batch_size: int = None):
+    """
+    Stream every user as CSV or JSONL text, including the password hash so the
+    output can be re-imported. Pages through users by id (keyset pagination).
+    """
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+    columns = (models.User.id, models.User.email, models.User.hashed_password, models.User.created_at)
+    if fmt == "csv":
+        yield "id,email,hashed_password,created_at\n"
+    elif fmt != "jsonl":
+        raise ValueError(f"Unsupported format: {fmt}")
+    last_id = 0
+    while True:
+        rows = db.execute(select(*columns).where(models.User.id > last_id).order_by(models.User.id).limit(batch_size)).all()
+        if not rows:
+            return
+        out = io.StringIO()
+        if fmt == "csv":
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerows((r.id, r.email, r.hashed_password, r.created_at.isoformat() if r.created_at else "") for r in rows)
+        else:
+            for r in rows:
+                out.write(json.dumps({
+                    "id": r.id,
+                    "email": r.email,
+                    "hashed_password": r.hashed_password,
+                    "created_at": r.created_at.isoformat() if r.created_at else None,
+                }) + "\n")
+        yield out.getvalue()
+        last_id = rows[-1].id
+
+
+# Standalone entry point: python -m app.services.bulk_users import users.csv | export users.jsonl
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import or export users.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="import users from a CSV or JSONL file ('-' for stdin)")
+    imp.add_argument("path")
+    imp.add_argument("--format", choices=FORMATS)
+    imp.add_argument("--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE)
+    exp = sub.add_parser("export", help="export users to a CSV or JSONL file ('-' for stdout)")
+    exp.add_argument("path")
+    exp.add_argument("--format", choices=FORMATS)
+    exp.add_argument("--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+
+    db = SessionLocal()
+    try:
+        if args.command == "import":
+            f = sys.stdin if args.path == "-" else open(args.path, newline="")
+            with f:
+                stats = import_users(db, iter_records(f, fmt), args.batch_size)
+            print(json.dumps(stats))
+        else:
+            f = sys.stdout if args.path == "-" else open(args.path, "w", newline="")
+            with f:
+                for chunk in export_users(db, fmt, args.batch_size):
+                    f.write(chunk)
+    finally:
+        db.close()
+        hashing.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Last-login tracking with coalesced, batched writes. Recording a login never touches
+# the database on the request path: logins within LAST_LOGIN_RESOLUTION_SECONDS of the
+# stored value are skipped, the rest are buffered per user (a user logging in repeatedly
+# leaves one pending write) and flushed by a background task as a single executemany
+# UPDATE in one transaction. Lockout decisions don't depend on these writes; they are
+# made synchronously in counter storage (app.core.lockout).
+#
+# The buffer is bounded: when LAST_LOGIN_MAX_PENDING users are pending the oldest entry
+# is dropped, so a stalled flush costs some last-login times, never a login. The UPDATE
+# is a Core statement, so a user deleted since logging in matches no row instead of
+# failing the whole batch.
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, update
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+users = models.User.__table__
+UPDATE_LAST_LOGIN = (
+    update(users).where(users.c.id == bindparam("user_id")).values(last_login_at=bindparam("at"))
+)
+
+
+class LastLoginWriter:
+    def __init__(self, resolution_seconds: int, max_pending: int):
+        self.resolution_seconds = resolution_seconds
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.last_flush_seconds = 0.0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    # Record a successful login for a user (an ORM user with id and last_login_at).
+    # Never touches the database and never raises: last-login is best effort.
+    def record(self, user):
+        try:
+            now = datetime.now(timezone.utc)
+            last = user.last_login_at
+            if last is not None:
+                if last.tzinfo is None:
+                    last = last.replace(tzinfo=timezone.utc)
+                if (now - last).total_seconds() < self.resolution_seconds:
+                    self.skipped += 1
+                    return
+            with self._lock:
+                self._pending.pop(user.id, None)
+                self._pending[user.id] = now
+                self.recorded += 1
+                self._trim()
+        except Exception:
+            logger.exception("Failed to record last login")
+
+    # Drop the oldest pending entries beyond max_pending (call with the lock held)
+    def _trim(self):
+        while len(self._pending) > self.max_pending:
+            del self._pending[next(iter(self._pending))]
+            self.dropped += 1
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # Write all pending last-login times in one batched UPDATE; returns rows written
+    def flush(self, session_factory=SessionLocal) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        started = time.perf_counter()
+        db = session_factory()
+        try:
+            result = db.execute(UPDATE_LAST_LOGIN, [{"user_id": user_id, "at": at} for user_id, at in pending.items()])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put the batch back for the next flush ahead of (and superseded by) newer
+            # logins, still bounded by max_pending
+            with self._lock:
+                pending.update(self._pending)
+                self._pending = pending
+                self._trim()
+            raise
+        finally:
+            db.close()
+        # Users deleted since logging in match no row and aren't counted
+        written = result.rowcount
+        self.flushes += 1
+        self.rows_written += written
+        self.last_flush_seconds = time.perf_counter() - started
+        return written
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending(),
+            "recorded": self.recorded,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+async def run_writer(interval_seconds: float):
+    """
+    Flush pending last-login writes every interval_seconds until cancelled.
+    The flush runs in the threadpool so it never blocks the event loop.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(last_login_writer.flush)
+        except Exception:
+            logger.exception("Last-login flush failed")
+
+
+# Shared writer instance
+last_login_writer = LastLoginWriter(settings.LAST_LOGIN_RESOLUTION_SECONDS, settings.LAST_LOGIN_MAX_PENDING)
@@ -0,0 +1,82 @@
+# Worker prewarming: open database connections and load the password hashing and
+# token signing paths before the worker reports ready, so the first requests after
+# a scale-out don't pay for them
+import logging
+import time
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from app.core import hashing, security
+from app.core.config import settings
+from app.core.storage import get_counter_storage
+from app.db.session import get_async_sessionmaker, get_engine
+from app.db import session
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent in each stage of the last prewarm
+prewarm_stats = {}
+
+
+# Check out connections together, then return them so they stay open in the pool
+def open_connections(engine, count: int):
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+# Async variant of open_connections for the async engine
+async def open_async_connections(engine, count: int):
+    connections = []
+    try:
+        for _ in range(count):
+            connection = await engine.connect()
+            await connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+# Compute the dummy hash in-process and verify it once through the hashing pool,
+# which loads the hash backend here and starts the worker processes
+def warm_password_hashing():
+    hashing.verify_password("prewarm", security.dummy_password_hash())
+
+
+async def prewarm(connections: int = None):
+    """
+    Open database pool connections, compute one password hash (starting the
+    hashing workers), sign one token and touch the counter storage.
+    Connections beyond the pool size would be discarded on return, so at most
+    DB_POOL_SIZE are opened. Returns the seconds spent per stage.
+    """
+    connections = min(settings.PREWARM_CONNECTIONS if connections is None else connections, settings.DB_POOL_SIZE)
+    started = time.perf_counter()
+    stage_started = started
+
+    def finish(stage):
+        nonlocal stage_started
+        now = time.perf_counter()
+        prewarm_stats[stage] = now - stage_started
+        stage_started = now
+
+    await run_in_threadpool(open_connections, get_engine(), connections)
+    if settings.ASYNC_DB:
+        get_async_sessionmaker()
+        await open_async_connections(session.async_engine, connections)
+    finish("db_connections")
+    await run_in_threadpool(warm_password_hashing)
+    finish("password_hashing")
+    security.create_access_token({"sub": "prewarm"})
+    finish("token_signing")
+    await run_in_threadpool(get_counter_storage().get, "prewarm")
+    finish("counter_storage")
+    prewarm_stats["total"] = time.perf_counter() - started
+    logger.info("Prewarmed worker in %.3fs: %s", prewarm_stats["total"], prewarm_stats)
+    return prewarm_stats
@@ -0,0 +1,89 @@
+# Background reaper deleting expired refresh tokens in bounded batches
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db import crud
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Metrics for the most recent and all reaper runs
+reaper_stats = {
+    "runs": 0,
+    "last_run_purged": 0,
+    "last_run_seconds": 0.0,
+    "last_run_at": None,
+    "total_purged": 0,
+}
+
+
+def purge_expired_refresh_tokens(batch_size: int = None, max_batches: int = None, pause_seconds: float = None):
+    """
+    Delete expired refresh tokens, one short transaction per batch, until a
+    batch comes back smaller than batch_size (or max_batches is reached).
+    Sleeps pause_seconds between batches so the purge doesn't hold locks back to back.
+    Returns the number of rows deleted.
+    """
+    batch_size = batch_size or settings.REFRESH_TOKEN_REAPER_BATCH_SIZE
+    if pause_seconds is None:
+        pause_seconds = settings.REFRESH_TOKEN_REAPER_BATCH_PAUSE_SECONDS
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    purged = 0
+    batches = 0
+    db = SessionLocal()
+    try:
+        while max_batches is None or batches < max_batches:
+            if batches and pause_seconds > 0:
+                time.sleep(pause_seconds)
+            deleted = crud.delete_expired_refresh_tokens(db, now, batch_size)
+            purged += deleted
+            batches += 1
+            if deleted < batch_size:
+                break
+    finally:
+        db.close()
+    reaper_stats["runs"] += 1
+    reaper_stats["last_run_purged"] = purged
+    reaper_stats["last_run_seconds"] = time.perf_counter() - started
+    reaper_stats["last_run_at"] = now.isoformat()
+    reaper_stats["total_purged"] += purged
+    logger.info("Purged %d expired refresh tokens in %d batches", purged, batches)
+    return purged
+
+
+async def run_reaper(interval_seconds: int):
+    """
+    Run purge_expired_refresh_tokens every interval_seconds until cancelled.
+    The purge runs in the threadpool so it never blocks the event loop.
+    """
+    while True:
+        try:
+            await run_in_threadpool(purge_expired_refresh_tokens)
+        except Exception:
+            logger.exception("Refresh token reaper run failed")
+        await asyncio.sleep(interval_seconds)
+
+
+# Standalone entry point: python -m app.services.token_reaper
+def main():
+    parser = argparse.ArgumentParser(description="Delete expired refresh tokens in batches.")
+    parser.add_argument("--batch-size", type=int, default=settings.REFRESH_TOKEN_REAPER_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=settings.REFRESH_TOKEN_REAPER_BATCH_PAUSE_SECONDS, help="seconds between batches")
+    parser.add_argument("--interval", type=int, default=0, help="repeat every N seconds (default: run once)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        purge_expired_refresh_tokens(args.batch_size, args.max_batches, args.pause)
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
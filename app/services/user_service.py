@@ -1,79 +1,118 @@
 # Service functions for user authentication and management
 from sqlalchemy.orm import Session
 from app.db import crud
-from app.core.security import verify_password, create_access_token, create_refresh_token, verify_token, get_password_hash
-from datetime import datetime, timedelta
+from app.core.security import create_token_pair, verify_token
+from app.core.hashing import verify_password, verify_and_update_password, get_password_hash
+from app.core.token_cache import token_cache
+from app.core.email_filter import email_filter
+from app.core.security import dummy_password_hash
+from app.db.replicas import replica_router
+from app.db.session import SessionLocal
+from app.core import lockout
+from app.core.metrics import timed
+from app.core.config import settings
+from app.services.last_login import last_login_writer
 
 
+@timed("authenticate_user")
 def authenticate_user(db: Session, email: str, password: str):
     """
     Authenticate a user by email and password.
     Handles account lockout after multiple failed attempts.
-    Resets counters on success.
+    Resets counters on success, and records the login time (written in batches).
+    Failed-attempt and lockout counters live in counter storage, not the users table.
+    Rehashes the password when the stored hash's scheme or cost is outdated.
+    The user lookup may be served by a read replica; the lockout state and any
+    rehash are written through counter storage and the primary.
+    Emails the email filter knows are unregistered skip the user lookup; unknown
+    emails still pay for one password verification so they are not distinguishable by timing.
     """
-    user = crud.get_user_by_email(db, email)
+    if lockout.is_locked(email):
+        return None  # Account is locked
+    if not email_filter.contains(email, SessionLocal):
+        verify_password(password, dummy_password_hash())
+        return None
+    user = crud.get_user_by_email(db, email, replica=True)
     if not user:
+        verify_password(password, dummy_password_hash())
         return None
-    now = datetime.utcnow()
-    lockout_until = getattr(user, 'lockout_until', None)
-    if lockout_until and lockout_until > now:
-        return None  # Account is locked
-    if not verify_password(password, user.hashed_password):
-        failed_attempts = getattr(user, 'failed_login_attempts', 0) or 0
-        user.failed_login_attempts = failed_attempts + 1
-        if user.failed_login_attempts >= 5:
-            user.lockout_until = now + timedelta(minutes=15)
-            user.failed_login_attempts = 0
-        db.commit()
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
+        lockout.register_failed_login(email)
         return None
-    # Success: reset counters
-    user.failed_login_attempts = 0
-    user.lockout_until = None
-    db.commit()
+    # Opportunistically upgrade hashes made with an outdated scheme or cost
+    if new_hash:
+        crud.update_password_hash(db, user, new_hash)
+    # Success: reset counters (only written when there were failures) and record the
+    # login for the batched last-login writer
+    lockout.reset_failed_logins(email)
+    if settings.LAST_LOGIN_TRACKING:
+        last_login_writer.record(user)
     return user
 
 
+@timed("issue_tokens")
 def issue_tokens(db: Session, user):
     """
     Issue a new access token and refresh token for a user.
     Stores the refresh token in the database.
     """
-    access_token = create_access_token({"sub": user.email})
-    refresh_token = create_refresh_token({"sub": user.email})
-    payload = verify_token(refresh_token)
-    expires_at = datetime.utcfromtimestamp(payload["exp"]) if payload and "exp" in payload else datetime.utcnow() + timedelta(days=7)
+    access_token, refresh_token, expires_at = create_token_pair(user.email)
     crud.create_refresh_token(db, user.id, refresh_token, expires_at)
     return access_token, refresh_token
 
 
+@timed("rotate_refresh_token")
 def validate_and_rotate_refresh_token(db: Session, refresh_token: str):
     """
-    Validate a refresh token, rotate it (delete old, issue new), and return new tokens.
+    Validate a refresh token, rotate it (replace old with new), and return new tokens.
+    The swap is a single UPDATE ... RETURNING in one transaction, so reusing the
+    same refresh token concurrently succeeds at most once.
     """
     payload = verify_token(refresh_token)
-    if not payload:
+    if not payload or "sub" not in payload:
         return None, None
-    db_token = crud.get_refresh_token(db, refresh_token)
-    # Ensure expires_at is a datetime, not a SQLAlchemy column
-    expires_at = getattr(db_token, "expires_at", None)
-    if db_token is None or expires_at is None or (isinstance(expires_at, datetime) and expires_at < datetime.utcnow()):
+    access_token, new_refresh_token, expires_at = create_token_pair(payload["sub"])
+    user_id = crud.rotate_refresh_token(db, refresh_token, new_refresh_token, expires_at, payload["sub"])
+    if user_id is None:
         return None, None
-    # Find user by id from db_token
-    user = db.query(crud.models.User).filter(crud.models.User.id == db_token.user_id).first()
-    if not user:
-        return None, None
-    # Rotate: delete old, issue new
-    crud.delete_refresh_token(db, refresh_token)
-    return issue_tokens(db, user)
+    return access_token, new_refresh_token
 
 
+@timed("change_password")
 def change_user_password(db: Session, user, old_password: str, new_password: str):
     """
     Change the user's password after verifying the old password.
+    Revokes all of the user's sessions, including outstanding access tokens,
+    in the same transaction.
     Returns True on success, False if old password is incorrect.
     """
     if not verify_password(old_password, user.hashed_password):
         return False
     user.hashed_password = get_password_hash(new_password)
-    db.commit()
-    return True 
\ No newline at end of file
+    replica_router.mark_changed(user.email)
+    crud.revoke_user_sessions(db, user.id)
+    token_cache.invalidate_subject(user.email)
+    return True
+
+
+@timed("revoke_sessions")
+def revoke_user_sessions(db: Session, user_id: int, email: str):
+    """
+    Revoke every session of a user: delete all their refresh tokens and reject
+    access tokens issued so far. Returns the number of refresh tokens deleted.
+    """
+    replica_router.mark_changed(email)
+    revoked = crud.revoke_user_sessions(db, user_id)
+    token_cache.invalidate_subject(email)
+    return revoked
+
+
+def revoke_refresh_token(db: Session, refresh_token: str):
+    """
+    Revoke (delete) a refresh token and drop cached access tokens for its user.
+    """
+    crud.delete_refresh_token(db, refresh_token)
+    payload = verify_token(refresh_token)
+    if payload and "sub" in payload:
+        token_cache.invalidate_subject(payload["sub"])
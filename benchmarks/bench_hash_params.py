@@ -0,0 +1,81 @@
+"""
+Per-hash latency for password hashing schemes and cost parameters.
+
+Times hash and verify on this machine for a grid of bcrypt rounds and argon2
+memory/time parameters (plus the currently configured settings) to help pick
+BCRYPT_ROUNDS / ARGON2_* values. A common target is 100-300 ms per verify on
+production hardware; pass --target-ms to mark the configurations under it.
+
+Usage: python -m benchmarks.bench_hash_params [--iterations 5] [--target-ms 250]
+"""
+import argparse
+import statistics
+import time
+
+from app.core.config import settings
+from app.core.security import build_crypt_context
+
+BCRYPT_ROUNDS = (10, 11, 12, 13, 14)
+ARGON2_PARAMS = (  # (memory_cost KiB, time_cost, parallelism)
+    (19456, 2, 1),
+    (65536, 2, 4),
+    (65536, 3, 4),
+    (131072, 3, 4),
+)
+
+
+def configurations():
+    for rounds in BCRYPT_ROUNDS:
+        yield f"bcrypt rounds={rounds}", ["bcrypt"], dict(bcrypt_rounds=rounds)
+    for memory_cost, time_cost, parallelism in ARGON2_PARAMS:
+        yield (f"argon2 m={memory_cost} t={time_cost} p={parallelism}", ["argon2"],
+               dict(argon2_memory_cost=memory_cost, argon2_time_cost=time_cost, argon2_parallelism=parallelism))
+
+
+def build(schemes, overrides):
+    params = dict(
+        bcrypt_rounds=settings.BCRYPT_ROUNDS,
+        argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2_time_cost=settings.ARGON2_TIME_COST,
+        argon2_parallelism=settings.ARGON2_PARALLELISM,
+    )
+    params.update(overrides)
+    return build_crypt_context(schemes, **params)
+
+
+def measure(context, iterations: int):
+    hash_times, verify_times = [], []
+    hashed = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        hashed = context.hash("benchmark-password")
+        hash_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        assert context.verify("benchmark-password", hashed)
+        verify_times.append(time.perf_counter() - start)
+    return statistics.median(hash_times) * 1000, statistics.median(verify_times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    schemes = [s.strip() for s in settings.PASSWORD_HASH_SCHEMES.split(",") if s.strip()]
+    rows = [(f"current ({schemes[0]})", schemes[:1], {})] + list(configurations())
+    print(f"{'configuration':>34} {'hash ms':>9} {'verify ms':>10}")
+    for label, scheme, overrides in rows:
+        try:
+            hash_ms, verify_ms = measure(build(scheme, overrides), args.iterations)
+        except Exception as exc:  # e.g. argon2-cffi not installed
+            print(f"{label:>34}  unavailable: {exc}")
+            continue
+        mark = ""
+        if args.target_ms is not None and verify_ms <= args.target_ms:
+            mark = "  <= target"
+        print(f"{label:>34} {hash_ms:>9.1f} {verify_ms:>10.1f}{mark}")
+
+
+if __name__ == "__main__":
+    main()
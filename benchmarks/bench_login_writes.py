@@ -0,0 +1,142 @@
+"""
+Writes per successful login: eager bookkeeping vs coalesced.
+
+The eager flow clears the failed-attempt counter unconditionally and writes
+last_login_at with its own UPDATE and commit on every login. The coalesced
+flow (authenticate_user) only clears the counter when there were failures,
+skips users whose last_login_at is recent and batches the rest into one
+UPDATE per flush. Logins are spread over a pool of users and the writer is
+flushed every --flush-every logins, standing in for the background interval.
+Reports latency, database commits, SQL statements and counter-storage writes
+per login.
+
+Usage: python -m benchmarks.bench_login_writes [--logins 2000] [--users 200] [--flush-every 250]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_login_writes.db")
+# Keep hashing cheap and inline so the bookkeeping writes dominate
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+# Keep counters in the process instead of the shared default ./auth-counters.db
+os.environ.setdefault("COUNTER_STORAGE_URI", "memory://")
+
+from sqlalchemy import event, update
+
+from app.core.security import get_password_hash, verify_password
+from app.core.storage import get_counter_storage
+from app.db import crud, models
+from app.db.base import Base
+from app.db.session import SessionLocal, get_engine
+from app.services.last_login import last_login_writer
+from app.services.user_service import authenticate_user
+
+PASSWORD = "benchpassword"
+
+
+# The per-login bookkeeping this benchmark compares against
+def eager_login(db, email: str, password: str):
+    user = crud.get_user_by_email(db, email)
+    if not user or not verify_password(password, user.hashed_password):
+        return None
+    get_counter_storage().delete(f"login:failures:{email}")
+    db.execute(update(models.User).where(models.User.id == user.id).values(last_login_at=datetime.now(timezone.utc)))
+    db.commit()
+    return user
+
+
+def run(login, emails, flush_every: int):
+    # Start each run from users with no recorded login
+    db = SessionLocal()
+    try:
+        db.execute(update(models.User).values(last_login_at=None))
+        db.commit()
+    finally:
+        db.close()
+    counts = {"commits": 0, "statements": 0, "storage_writes": 0}
+
+    def count_commit(*args):
+        counts["commits"] += 1
+
+    def count_statement(*args):
+        counts["statements"] += 1
+
+    # Count counter-storage writes on the shared storage instance
+    storage = get_counter_storage()
+    delete, incr = storage.delete, storage.incr
+
+    def counted_delete(*args, **kwargs):
+        counts["storage_writes"] += 1
+        return delete(*args, **kwargs)
+
+    def counted_incr(*args, **kwargs):
+        counts["storage_writes"] += 1
+        return incr(*args, **kwargs)
+
+    storage.delete, storage.incr = counted_delete, counted_incr
+    engine = get_engine()
+    event.listen(engine, "commit", count_commit)
+    event.listen(engine, "before_cursor_execute", count_statement)
+    latencies = []
+    try:
+        for i, email in enumerate(emails, 1):
+            db = SessionLocal()
+            try:
+                start = time.perf_counter()
+                assert login(db, email, PASSWORD) is not None
+                latencies.append(time.perf_counter() - start)
+            finally:
+                db.close()
+            if i % flush_every == 0:
+                last_login_writer.flush()
+        last_login_writer.flush()
+    finally:
+        event.remove(engine, "commit", count_commit)
+        event.remove(engine, "before_cursor_execute", count_statement)
+        del storage.delete, storage.incr
+    latencies.sort()
+    logins = len(emails)
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(logins * 0.99) - 1] * 1000,
+        **{name: value / logins for name, value in counts.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--flush-every", type=int, default=250)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine())
+    hashed = get_password_hash(PASSWORD)
+    pool = [f"bench-login-{i}@example.com" for i in range(args.users)]
+    db = SessionLocal()
+    try:
+        for email in pool:
+            if crud.get_user_by_email(db, email) is None:
+                db.add(models.User(email=email, hashed_password=hashed))
+        db.commit()
+    finally:
+        db.close()
+    emails = [random.choice(pool) for _ in range(args.logins)]
+
+    print(f"{'flow':>10} {'p50 ms':>8} {'p99 ms':>8} {'commits':>8} {'SQL':>6} {'storage':>8}  (per login)")
+    for name, login in (("eager", eager_login), ("coalesced", authenticate_user)):
+        result = run(login, emails, args.flush_every)
+        print(
+            f"{name:>10} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['commits']:>8.3f} "
+            f"{result['statements']:>6.2f} {result['storage_writes']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Middleware stack overhead on /auth/me.
+
+Builds two copies of the app around the same auth router and drives /auth/me
+through an in-process ASGI client:
+
+  before  BaseHTTPMiddleware security headers + "http" rate-limit middleware
+  after   pure ASGI SecurityHeadersMiddleware + RateLimitMiddleware
+
+Reports requests/sec and p50/p99 latency for each stack.
+
+Usage: python -m benchmarks.bench_middleware [--requests 2000] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_middleware.db")
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api.routes import auth
+from app.core.middleware import SecurityHeadersMiddleware, RateLimitMiddleware
+from app.core.rate_limit import RateLimiter
+from app.core.security import create_access_token
+from app.core.storage import MemoryStorage
+from app.db import crud, models
+from app.db.base import Base
+from app.db.session import SessionLocal, get_engine
+
+# Effectively unlimited so the benchmark measures middleware cost, not rejections
+BENCH_RATE_LIMIT = "1000000/second"
+
+
+# The BaseHTTPMiddleware implementation this benchmark compares against
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains; preload"
+        response.headers["Referrer-Policy"] = "no-referrer"
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+
+def build_before_app() -> FastAPI:
+    app = FastAPI()
+    limiter = RateLimiter(MemoryStorage(), BENCH_RATE_LIMIT)
+    app.add_middleware(LegacySecurityHeadersMiddleware)
+
+    @app.middleware("http")
+    async def rate_limit_middleware(request: Request, call_next):
+        if not limiter.hit(request.client.host if request.client else "127.0.0.1"):
+            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+        return await call_next(request)
+
+    app.include_router(auth.router, prefix="/auth")
+    return app
+
+
+def build_after_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(MemoryStorage(), BENCH_RATE_LIMIT))
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.include_router(auth.router, prefix="/auth")
+    return app
+
+
+def create_bench_user(email: str) -> str:
+    Base.metadata.create_all(bind=get_engine())
+    db = SessionLocal()
+    try:
+        if crud.get_user_by_email(db, email) is None:
+            db.add(models.User(email=email, hashed_password="unused"))
+            db.commit()
+    finally:
+        db.close()
+    return create_access_token({"sub": email})
+
+
+async def drive(app: FastAPI, token: str, requests: int, concurrency: int):
+    latencies = []
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(count: int):
+            for _ in range(count):
+                start = time.perf_counter()
+                response = await client.get("/auth/me", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        await worker(min(50, requests))  # warm-up
+        latencies.clear()
+        start = time.perf_counter()
+        per_worker = requests // concurrency
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    token = create_bench_user("bench-middleware@example.com")
+    print(f"{'stack':>8} {'req/sec':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, build in (("before", build_before_app), ("after", build_after_app)):
+        result = asyncio.run(drive(build(), token, args.requests, args.concurrency))
+        print(f"{name:>8} {result['rps']:>10.1f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Login throughput vs. password hashing worker count.
+
+Runs a fixed number of bcrypt verifications (the CPU cost of one login)
+through the hashing pool for each worker count and reports logins/sec.
+
+Usage: python -m benchmarks.bench_password_hashing [--logins 64] [--workers 1 2 4]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.core import hashing, security
+from app.core.config import settings
+
+
+async def _run(logins: int, hashed: str):
+    # Keep at most PASSWORD_HASH_QUEUE_SIZE jobs in flight so the pool never rejects
+    gate = asyncio.Semaphore(settings.PASSWORD_HASH_QUEUE_SIZE)
+
+    async def one():
+        async with gate:
+            assert await hashing.verify_password_async("benchmark-password", hashed)
+
+    await asyncio.gather(*(one() for _ in range(logins)))
+
+
+def bench(workers: int, logins: int, hashed: str) -> float:
+    settings.PASSWORD_HASH_WORKERS = workers
+    hashing.shutdown()
+    # Warm up the pool so process start-up is not measured
+    asyncio.run(_run(max(workers, 1), hashed))
+    start = time.perf_counter()
+    asyncio.run(_run(logins, hashed))
+    elapsed = time.perf_counter() - start
+    hashing.shutdown()
+    return logins / elapsed
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({0, 1, 2, 4, cpus} - {w for w in (2, 4) if w > cpus})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    hashed = security.get_password_hash("benchmark-password")
+    print(f"cpus={cpus} logins={args.logins}")
+    print(f"{'workers':>8} {'logins/sec':>12}")
+    for workers in args.workers:
+        rate = bench(workers, args.logins, hashed)
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:>8} {rate:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Connection pool exhaustion load test.
+
+Runs the app with a deliberately small pool and fires concurrent requests at
+a route that holds a connection for --hold seconds. Requests that cannot check
+out a connection within DB_POOL_TIMEOUT get a fast 503 instead of queueing
+indefinitely. Requests with an invalid bearer token are mixed in to show they
+are rejected without ever checking out a connection.
+
+Usage: python -m benchmarks.bench_pool_exhaustion [--concurrency 20] [--hold 0.2]
+Pool settings come from the environment (defaults here: size 2, overflow 0, timeout 0.5s).
+"""
+import argparse
+import asyncio
+import collections
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_pool.db")
+os.environ.setdefault("DB_POOL_SIZE", "2")
+os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+os.environ.setdefault("DB_POOL_TIMEOUT", "0.5")
+os.environ.setdefault("RATE_LIMIT", "1000000/second")
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import text
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.db.pool import pool_stats
+from app.main import app
+
+
+# Route that keeps its connection checked out for a while, like a slow query
+@app.get("/bench/hold")
+def hold_connection(seconds: float, db=Depends(get_db)):
+    db.execute(text("SELECT 1"))
+    time.sleep(seconds)
+    return {"held": seconds}
+
+
+async def main_async(concurrency: int, hold: float, rounds: int):
+    statuses = collections.Counter()
+    latencies = collections.defaultdict(list)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(kind: str):
+            start = time.perf_counter()
+            if kind == "hold":
+                response = await client.get("/bench/hold", params={"seconds": hold})
+            else:
+                response = await client.get("/auth/me", headers={"Authorization": "Bearer invalid"})
+            latencies[(kind, response.status_code)].append(time.perf_counter() - start)
+            statuses[(kind, response.status_code)] += 1
+
+        for _ in range(rounds):
+            jobs = [one("hold") for _ in range(concurrency)] + [one("invalid-token") for _ in range(concurrency // 4 or 1)]
+            await asyncio.gather(*jobs)
+
+    print(f"pool_size={settings.DB_POOL_SIZE} max_overflow={settings.DB_MAX_OVERFLOW} "
+          f"pool_timeout={settings.DB_POOL_TIMEOUT}s concurrency={concurrency} hold={hold}s")
+    print(f"{'request':>14} {'status':>6} {'count':>6} {'p50 ms':>8} {'max ms':>8}")
+    for (kind, status), values in sorted(latencies.items()):
+        print(f"{kind:>14} {status:>6} {statuses[(kind, status)]:>6} "
+              f"{statistics.median(values) * 1000:>8.1f} {max(values) * 1000:>8.1f}")
+    print("pool:", pool_stats.snapshot())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--hold", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.concurrency, args.hold, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
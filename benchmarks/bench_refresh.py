@@ -0,0 +1,97 @@
+"""
+Refresh-token rotation latency and database round trips.
+
+Compares the previous rotation flow (SELECT token, SELECT user, SELECT +
+DELETE + commit, INSERT + commit + refresh) with the single UPDATE ...
+RETURNING rotation used by validate_and_rotate_refresh_token. Each run chains
+sequential rotations of one token and reports p50/p99 latency and SQL
+statements per rotation.
+
+Usage: python -m benchmarks.bench_refresh [--rotations 500]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/bench_refresh.db")
+
+from sqlalchemy import event
+
+from app.core.security import verify_token
+from app.db import crud, models
+from app.db.base import Base
+from app.db.session import SessionLocal, get_engine
+from app.services.user_service import issue_tokens, validate_and_rotate_refresh_token
+
+
+# The multi-round-trip rotation this benchmark compares against
+def legacy_rotate(db, refresh_token):
+    payload = verify_token(refresh_token)
+    if not payload:
+        return None, None
+    db_token = crud.get_refresh_token(db, refresh_token)
+    if db_token is None:
+        return None, None
+    user = crud.get_user_by_id(db, db_token.user_id)
+    if not user:
+        return None, None
+    crud.delete_refresh_token(db, refresh_token)
+    return issue_tokens(db, user)
+
+
+def run(rotate, rotations: int, user):
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    db = SessionLocal()
+    try:
+        _, refresh_token = issue_tokens(db, user)
+        event.listen(get_engine(), "before_cursor_execute", count)
+        latencies = []
+        for _ in range(rotations):
+            start = time.perf_counter()
+            _, refresh_token = rotate(db, refresh_token)
+            latencies.append(time.perf_counter() - start)
+            assert refresh_token is not None
+        event.remove(get_engine(), "before_cursor_execute", count)
+    finally:
+        db.close()
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "statements": statements / rotations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rotations", type=int, default=500)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine())
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, "bench-refresh@example.com")
+        if user is None:
+            user = models.User(email="bench-refresh@example.com", hashed_password="unused")
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        db.expunge(user)
+    finally:
+        db.close()
+
+    print(f"{'flow':>8} {'p50 ms':>8} {'p99 ms':>8} {'SQL/rotation':>13}")
+    for name, rotate in (("legacy", legacy_rotate), ("single", validate_and_rotate_refresh_token)):
+        result = run(rotate, args.rotations, user)
+        print(f"{name:>8} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['statements']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
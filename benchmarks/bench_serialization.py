@@ -0,0 +1,136 @@
+"""
+Per-request serialization overhead on the token and profile endpoints.
+
+Part 1 times encoding the login/refresh token body and the /auth/me user body
+(microseconds per call):
+
+  response_model   what FastAPI does for a returned dict: validate it through
+                   the response model's TypeAdapter, then dump JSON
+  jsonable+json    the path for routes without a response model:
+                   jsonable_encoder, then the standard library encoder
+  json / orjson / msgspec
+                   encoding the already-valid dict with each backend
+                   (orjson and msgspec only if installed)
+
+Part 2 drives two minimal apps through an in-process ASGI client, one route
+returning a dict with response_model=TokenResponse and one returning
+json_response(...), for both sync and async handlers, and reports the
+per-request difference. Sync handlers also save the threadpool hop FastAPI
+uses to validate their return value.
+
+Usage: python -m benchmarks.bench_serialization [--iterations 20000] [--requests 2000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.responses import _stdlib_dumps, json_response, load_encoder
+from app.core.security import create_access_token, create_refresh_token
+from app.schemas.user import TokenResponse, UserResponse
+
+
+def bodies():
+    token_body = {
+        "access_token": create_access_token({"sub": "bench@example.com"}),
+        "refresh_token": create_refresh_token({"sub": "bench@example.com"}),
+        "token_type": "bearer",
+    }
+    user_body = {"id": 12345, "email": "bench@example.com"}
+    return {"token": (TokenResponse, token_body), "user": (UserResponse, user_body)}
+
+
+def encoders():
+    found = {"json": _stdlib_dumps}
+    for backend in ("orjson", "msgspec"):
+        try:
+            found[backend] = load_encoder(backend)[1]
+        except ImportError:
+            pass
+    return found
+
+
+def per_call_us(fn, iterations: int) -> float:
+    for _ in range(min(1000, iterations)):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bench_encoding(iterations: int):
+    print(f"{'body':<6} {'path':<16} {'us/call':>9}")
+    for name, (model, body) in bodies().items():
+        adapter = TypeAdapter(model)
+        paths = {
+            "response_model": lambda: adapter.dump_json(adapter.validate_python(body)),
+            "jsonable+json": lambda: _stdlib_dumps(jsonable_encoder(body)),
+        }
+        for backend, encode in encoders().items():
+            # Every backend must produce the same document
+            assert json.loads(encode(body)) == body, backend
+            paths[backend] = (lambda encode=encode: encode(body))
+        for path, fn in paths.items():
+            print(f"{name:<6} {path:<16} {per_call_us(fn, iterations):>9.2f}")
+
+
+def build_app(body) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync/model", response_model=TokenResponse)
+    def sync_model():
+        return body
+
+    @app.get("/sync/bytes", response_model=TokenResponse)
+    def sync_bytes():
+        return json_response(body)
+
+    @app.get("/async/model", response_model=TokenResponse)
+    async def async_model():
+        return body
+
+    @app.get("/async/bytes", response_model=TokenResponse)
+    async def async_bytes():
+        return json_response(body)
+
+    return app
+
+
+async def drive(app: FastAPI, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(100, requests)):
+            await client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(path)
+            assert response.status_code == 200, response.text
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def bench_routes(requests: int):
+    app = build_app(bodies()["token"][1])
+    print(f"\n{'handler':<8} {'model us':>10} {'bytes us':>10} {'saved us':>10}")
+    for handler in ("sync", "async"):
+        model_us = asyncio.run(drive(app, f"/{handler}/model", requests))
+        bytes_us = asyncio.run(drive(app, f"/{handler}/bytes", requests))
+        print(f"{handler:<8} {model_us:>10.1f} {bytes_us:>10.1f} {model_us - bytes_us:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    bench_encoding(args.iterations)
+    bench_routes(args.requests)
+
+
+if __name__ == "__main__":
+    main()
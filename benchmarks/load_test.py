@@ -0,0 +1,239 @@
+"""
+Load test for every /auth endpoint.
+
+Drives register, login, me, refresh, logout and change-password through the
+app in-process (httpx ASGI client) at a configurable concurrency, against a
+fresh SQLite file per run (removed afterwards) by default or any DATABASE_URL
+(e.g. a local Postgres). For each
+endpoint it reports throughput, p50/p95/p99 latency, and the average time per
+request spent hashing passwords vs. in database calls (from the
+auth_stage_duration_seconds metrics), so bcrypt cost can be told apart from
+database cost.
+
+Results can be written as JSON and compared against a saved baseline:
+
+    python -m benchmarks.load_test --requests 200 --concurrency 16 --output baseline.json
+    python -m benchmarks.load_test --requests 200 --concurrency 16 --baseline baseline.json
+
+With --baseline the exit status is 1 if any endpoint's throughput drops by
+more than --max-regression percent.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+# A fresh database per run, so the schema always matches the models
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), f"load_test-{uuid.uuid4().hex}.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DEFAULT_DB_PATH}")
+# Keep lockout and rate-limit counters in the process instead of the shared default file
+os.environ.setdefault("COUNTER_STORAGE_URI", "memory://")
+os.environ.setdefault("RATE_LIMIT", "1000000/second")
+os.environ.setdefault("REFRESH_TOKEN_REAPER_INTERVAL_SECONDS", "0")
+os.environ["METRICS_ENABLED"] = "true"
+
+import httpx
+
+from app.core import hashing
+from app.core.config import settings
+from app.core.metrics import stage_duration
+from app.core.security import get_password_hash
+from app.core.token_cache import token_cache
+from app.db import models
+from app.db.base import Base
+from app.db.session import SessionLocal, get_engine
+from app.main import app
+from app.services.user_service import issue_tokens
+
+PASSWORD = "loadtest-password"
+NEW_PASSWORD = "loadtest-password-2"
+ENDPOINTS = ["register", "login", "me", "refresh", "logout", "change-password"]
+
+
+def create_users(prefix: str, count: int):
+    """Insert users directly, sharing one precomputed hash so setup skips bcrypt."""
+    hashed = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        users = [models.User(email=f"{prefix}-{i}@loadtest.example.com", hashed_password=hashed) for i in range(count)]
+        db.add_all(users)
+        db.commit()
+        for user in users:
+            db.refresh(user)
+            db.expunge(user)
+        return users
+    finally:
+        db.close()
+
+
+def issue_token_pairs(users):
+    db = SessionLocal()
+    try:
+        return [issue_tokens(db, user) for user in users]
+    finally:
+        db.close()
+
+
+def build_requests(endpoint: str, count: int, run_id: str):
+    """Return a list of (method, path, kwargs) for one endpoint's run."""
+    if endpoint == "register":
+        return [("POST", "/auth/register", {"json": {"email": f"{run_id}-new-{i}@loadtest.example.com", "password": PASSWORD}})
+                for i in range(count)]
+    users = create_users(f"{run_id}-{endpoint}", count)
+    if endpoint == "login":
+        return [("POST", "/auth/login", {"json": {"email": u.email, "password": PASSWORD}}) for u in users]
+    pairs = issue_token_pairs(users)
+    if endpoint == "me":
+        # A handful of distinct tokens presented repeatedly, like real clients
+        tokens = [access for access, _ in pairs[:max(count // 20, 1)]]
+        return [("GET", "/auth/me", {"headers": {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}}) for i in range(count)]
+    if endpoint == "refresh":
+        return [("POST", "/auth/refresh", {"json": {"refresh_token": refresh}}) for _, refresh in pairs]
+    if endpoint == "logout":
+        return [("POST", "/auth/logout", {"json": {"refresh_token": refresh}}) for _, refresh in pairs]
+    if endpoint == "change-password":
+        return [("POST", "/auth/change-password", {
+            "headers": {"Authorization": f"Bearer {access}"},
+            "json": {"old_password": PASSWORD, "new_password": NEW_PASSWORD},
+        }) for access, _ in pairs]
+    raise ValueError(endpoint)
+
+
+def stage_breakdown(requests: int):
+    """Average milliseconds per request spent hashing vs. in database calls."""
+    hash_seconds = db_seconds = 0.0
+    for (stage,), (total, _) in stage_duration.totals().items():
+        if stage.startswith("password_"):
+            hash_seconds += total
+        elif stage.startswith("db_"):
+            db_seconds += total
+    return hash_seconds / requests * 1000, db_seconds / requests * 1000
+
+
+async def run_endpoint(client, endpoint: str, count: int, concurrency: int, run_id: str):
+    planned = build_requests(endpoint, count, run_id)
+    token_cache.clear()
+    stage_duration.clear()
+    latencies = []
+    errors = 0
+    queue = iter(planned)
+
+    async def worker():
+        nonlocal errors
+        for method, path, kwargs in queue:
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    hash_ms, db_ms = stage_breakdown(len(latencies))
+
+    def pct(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "hash_ms_per_request": hash_ms,
+        "db_ms_per_request": db_ms,
+    }
+
+
+async def run(endpoints, count: int, concurrency: int):
+    run_id = uuid.uuid4().hex[:8]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        for endpoint in endpoints:
+            results[endpoint] = await run_endpoint(client, endpoint, count, concurrency, run_id)
+    return results
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    ok = True
+    print(f"\n{'endpoint':>16} {'baseline rps':>13} {'current rps':>12} {'change':>8}")
+    for endpoint, current in results.items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        change = (current["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+        flag = ""
+        if change < -max_regression:
+            ok = False
+            flag = "  REGRESSION"
+        print(f"{endpoint:>16} {before['throughput_rps']:>13.1f} {current['throughput_rps']:>12.1f} {change:>7.1f}%{flag}")
+    return ok
+
+
+def remove_default_database():
+    """Delete the per-run SQLite file (and its WAL files) when DATABASE_URL wasn't set."""
+    if settings.SQLALCHEMY_DATABASE_URL != f"sqlite:///{DEFAULT_DB_PATH}":
+        return
+    get_engine().dispose()
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(DEFAULT_DB_PATH + suffix):
+            os.remove(DEFAULT_DB_PATH + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed throughput drop in percent")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine())
+    try:
+        results = asyncio.run(run(args.endpoints, args.requests, args.concurrency))
+    finally:
+        hashing.shutdown()
+        remove_default_database()
+
+    print(f"{'endpoint':>16} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hash ms':>8} {'db ms':>7} {'errors':>6}")
+    for endpoint, r in results.items():
+        print(f"{endpoint:>16} {r['throughput_rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['hash_ms_per_request']:>8.1f} {r['db_ms_per_request']:>7.2f} {r['errors']:>6}")
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "database": get_engine().url.get_backend_name(),
+            "async_db": settings.ASYNC_DB,
+            "hash_workers": settings.PASSWORD_HASH_WORKERS,
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "endpoints": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
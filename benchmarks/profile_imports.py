@@ -0,0 +1,84 @@
+"""
+Import-time profile of the application.
+
+Imports MODULE (default app.main) in fresh interpreters: once plainly to
+measure wall-clock import time (best of --runs), and once under
+``python -X importtime`` to list the modules with the largest cumulative and
+self import times. Engine, password hashing context, signing keys and counter
+storage are built on first use, so none of them should appear here.
+
+Pass --budget-ms to exit non-zero when the import time exceeds the budget,
+e.g. as a CI gate for worker cold starts.
+
+Usage: python -m benchmarks.profile_imports [--module app.main] [--top 20] [--runs 5] [--budget-ms 1500]
+"""
+import argparse
+import subprocess
+import sys
+
+TIMER = "import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+
+
+# Wall-clock seconds to import module in a fresh interpreter
+def import_seconds(module: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", TIMER.format(module=module)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+# Parse -X importtime output into (module, depth, self_us, cumulative_us) rows
+def importtime_rows(module: str):
+    stderr = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    # Rows are listed children first; keep the module's own subtree, dropping interpreter startup
+    end = max(i for i, row in enumerate(rows) if row[0] == module and row[1] == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def print_table(title, rows, key):
+    print(f"\n{title}")
+    print(f"{'module':<50} {'self ms':>9} {'cumul ms':>9}")
+    for name, depth, self_us, cumulative_us in sorted(rows, key=key, reverse=True):
+        print(f"{name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    timings = [import_seconds(args.module) for _ in range(args.runs)]
+    best_ms = min(timings) * 1000
+    print(f"import {args.module}: best {best_ms:.0f} ms, worst {max(timings) * 1000:.0f} ms over {args.runs} runs")
+
+    rows = importtime_rows(args.module)
+    direct = [row for row in rows if row[1] == 1]
+    print_table("Direct imports (cumulative)", direct, key=lambda row: row[3])
+    print_table(f"Top {args.top} modules by self time", sorted(rows, key=lambda row: row[2], reverse=True)[:args.top], key=lambda row: row[2])
+    app_rows = [row for row in rows if row[0] == "app" or row[0].startswith("app.")]
+    print_table("Application modules (cumulative)", app_rows, key=lambda row: row[3])
+
+    if args.budget_ms is not None and best_ms > args.budget_ms:
+        print(f"\nFAIL: {best_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+
+# Run against a local SQLite database unless DATABASE_URL points elsewhere
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+# The functional tests fire requests faster than the production rate limit
+os.environ.setdefault("RATE_LIMIT", "1000/second")
+# Keep rate-limit and lockout counters per test run instead of in the shared default file
+os.environ.setdefault("COUNTER_STORAGE_URI", "memory://")
+
+import pytest
+from app.db.base import Base
+from app.db import models  # noqa: F401  (register models on Base.metadata)
+from app.db.session import get_engine
+
+
+@pytest.fixture(scope="session", autouse=True)
+def create_tables():
+    # Start from an empty schema on SQLite; only create missing tables elsewhere
+    engine = get_engine()
+    is_sqlite = engine.url.get_backend_name() == "sqlite"
+    if is_sqlite:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    if is_sqlite:
+        Base.metadata.drop_all(bind=engine)
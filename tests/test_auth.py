@@ -1,15 +1,26 @@
+import importlib
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+import app.main
+from app.core.config import settings
 
-client = TestClient(app)
-
-TEST_EMAIL = "testuser@example.com"
 TEST_PASSWORD = "testpassword"
 NEW_PASSWORD = "newpassword"
 
 
-def test_register_user():
+# Run every flow against the sync router and again against the ASYNC_DB router (the app
+# picks one at import time, so it is rebuilt with the setting flipped)
+@pytest.fixture(scope="module", params=[False, True], ids=["sync", "async"])
+def variant(request):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "ASYNC_DB", request.param)
+        module = importlib.reload(app.main)
+    yield TestClient(module.app), "testuser-async@example.com" if request.param else "testuser@example.com"
+    importlib.reload(app.main)
+
+
+def test_register_user(variant):
+    client, TEST_EMAIL = variant
     # Register a new user
     response = client.post("/auth/register", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
     assert response.status_code == 200
@@ -19,7 +30,13 @@ def test_register_user():
     response = client.post("/auth/register", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
     assert response.status_code == 400
 
-def test_login_and_lockout():
+def test_login_and_lockout(variant):
+    client, TEST_EMAIL = variant
+    # Lock out a separate account so the flows below still run
+    TEST_EMAIL = "locked-" + TEST_EMAIL
+    response = client.post("/auth/register", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    assert response.status_code == 200
+
     # Login with correct credentials
     response = client.post("/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
     assert response.status_code == 200
@@ -35,7 +52,8 @@ def test_login_and_lockout():
     response = client.post("/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
     assert response.status_code == 401
 
-def test_token_refresh_and_logout():
+def test_token_refresh_and_logout(variant):
+    client, TEST_EMAIL = variant
     # Login to get tokens
     response = client.post("/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
     if response.status_code == 401:
@@ -57,7 +75,8 @@ def test_token_refresh_and_logout():
     response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
     assert response.status_code == 401
 
-def test_change_password_and_profile():
+def test_change_password_and_profile(variant):
+    client, TEST_EMAIL = variant
     # Login to get tokens
     response = client.post("/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
     if response.status_code == 401:
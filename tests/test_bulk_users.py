@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from app.core.config import settings
+from app.db import crud
+from app.db.session import SessionLocal
+from app.main import app
+from app.services.bulk_users import export_users, import_users, iter_records
+
+client = TestClient(app)
+
+BULK_PASSWORD = "bulkpassword"
+BULK_HASH = bcrypt.using(rounds=4).hash(BULK_PASSWORD)
+
+
+def _import(lines, fmt="jsonl", batch_size=None):
+    db = SessionLocal()
+    try:
+        return import_users(db, iter_records(lines, fmt), batch_size)
+    finally:
+        db.close()
+
+
+def test_import_normalizes_emails_and_counts_bad_records():
+    lines = [
+        json.dumps({"email": "Bulk.User@Example.COM", "hashed_password": BULK_HASH}),
+        json.dumps({"email": "bulk.user@example.com", "hashed_password": BULK_HASH}),
+        json.dumps({"email": "bulk-plain@example.com", "password": BULK_PASSWORD}),
+        json.dumps(["not", "an", "object"]),
+        json.dumps("bulk-string@example.com"),
+        "{not json",
+        json.dumps({"email": "not-an-email", "password": BULK_PASSWORD}),
+        json.dumps({"email": 42, "password": BULK_PASSWORD}),
+        json.dumps({"email": "bulk-nopass@example.com"}),
+        json.dumps({"email": "bulk-badhash@example.com", "hashed_password": "$2b$12$abc"}),
+    ]
+    stats = _import(lines, batch_size=4)
+    assert stats == {"imported": 3, "existing": 0, "duplicate": 0, "invalid": 7}
+
+    # The mixed-case domain was stored as the API normalizes it, so login works and the
+    # address can't be registered a second time
+    response = client.post("/auth/login", json={"email": "Bulk.User@EXAMPLE.com", "password": BULK_PASSWORD})
+    assert response.status_code == 200
+    response = client.post("/auth/register", json={"email": "Bulk.User@example.com", "password": BULK_PASSWORD})
+    assert response.status_code == 400
+    response = client.post("/auth/login", json={"email": "bulk-plain@example.com", "password": BULK_PASSWORD})
+    assert response.status_code == 200
+
+    # Re-importing reports existing rows instead of inserting them again
+    assert _import(lines[:3])["existing"] == 3
+
+
+def test_csv_import_and_export_round_trip():
+    source = "email,hashed_password\nbulk-csv-1@example.com,{0}\nbulk-csv-2@example.com,{0}\nbulk-csv-1@example.com,{0}\n"
+    stats = _import(io.StringIO(source.format(BULK_HASH)), fmt="csv")
+    assert stats == {"imported": 2, "existing": 0, "duplicate": 1, "invalid": 0}
+
+    db = SessionLocal()
+    try:
+        exported = "".join(export_users(db, "csv", batch_size=2))
+        jsonl = [json.loads(line) for line in "".join(export_users(db, "jsonl")).splitlines()]
+    finally:
+        db.close()
+    rows = list(csv.DictReader(io.StringIO(exported)))
+    assert {"bulk-csv-1@example.com", "bulk-csv-2@example.com"} <= {row["email"] for row in rows}
+    assert [row["email"] for row in rows] == [record["email"] for record in jsonl]
+    assert all(record["hashed_password"] for record in jsonl)
+
+
+def test_admin_import_and_export_endpoints(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "bulk-key")
+    headers = {"X-Admin-Key": "bulk-key"}
+    body = json.dumps({"email": "bulk-admin@example.com", "hashed_password": BULK_HASH}) + "\n[1, 2]\n"
+    response = client.post("/admin/users/import?format=jsonl", content=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"imported": 1, "existing": 0, "duplicate": 0, "invalid": 1}
+    assert client.post("/admin/users/import", content=body).status_code == 403
+
+    response = client.get("/admin/users/export?format=jsonl", headers=headers)
+    assert response.status_code == 200
+    assert "bulk-admin@example.com" in {json.loads(line)["email"] for line in response.text.splitlines()}
+    db = SessionLocal()
+    try:
+        assert crud.get_user_by_email(db, "bulk-admin@example.com") is not None
+    finally:
+        db.close()
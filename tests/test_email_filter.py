@@ -0,0 +1,81 @@
+from sqlalchemy import func, insert, select
+from app.core.email_filter import BloomFilter, EmailFilter
+from app.db import crud, models
+from app.db.session import SessionLocal
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    emails = [f"user{i}@example.com" for i in range(1000)]
+    for email in emails:
+        bloom.add(email)
+    assert all(email in bloom for email in emails)
+    false_positives = sum(f"other{i}@example.com" in bloom for i in range(10000))
+    assert false_positives < 300
+    assert bloom.estimated_fp_rate() < 0.02
+
+
+def _insert_outside_the_app(email: str, user_id: int = None):
+    db = SessionLocal()
+    try:
+        values = {"email": email, "hashed_password": "unused"}
+        if user_id is not None:
+            values["id"] = user_id
+        db.execute(insert(models.User).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _max_user_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.max(models.User.id))).scalar() or 0
+    finally:
+        db.close()
+
+
+def test_email_filter_catches_up_with_users_inserted_elsewhere():
+    db = SessionLocal()
+    try:
+        crud.get_user_by_email(db, "filter-before@example.com") or crud.create_user(db, "filter-before@example.com", "filterpassword")
+    finally:
+        db.close()
+
+    email_filter = EmailFilter(capacity=1000, fp_rate=0.01, sync_seconds=3600)
+    email_filter.build(SessionLocal)
+    assert email_filter.contains("filter-before@example.com", SessionLocal)
+    assert not email_filter.contains("filter-unknown@example.com", SessionLocal)
+
+    # A user registered through the app (any worker) publishes the insert, so the next
+    # miss catches up at once
+    db = SessionLocal()
+    try:
+        crud.get_user_by_email(db, "filter-after@example.com") or crud.create_user(db, "filter-after@example.com", "filterpassword")
+    finally:
+        db.close()
+    assert email_filter.contains("filter-after@example.com", SessionLocal)
+
+    # A row inserted behind the app's back is only seen once the sync interval passes
+    _insert_outside_the_app("filter-outside@example.com")
+    assert not email_filter.contains("filter-outside@example.com", SessionLocal)
+    email_filter.sync_seconds = 0
+    assert email_filter.contains("filter-outside@example.com", SessionLocal)
+    assert email_filter.stats()["definite_misses"] == 2
+
+
+def test_email_filter_picks_up_ids_committed_out_of_order():
+    email_filter = EmailFilter(capacity=1000, fp_rate=0.01, sync_seconds=3600)
+    email_filter.build(SessionLocal)
+    base = _max_user_id()
+
+    # A higher id commits (and is synced) before a lower one handed out earlier
+    _insert_outside_the_app("filter-gap-high@example.com", base + 10)
+    email_filter.publish()
+    assert email_filter.contains("filter-gap-high@example.com", SessionLocal)
+    assert email_filter.stats()["pending_gaps"] == 9
+
+    _insert_outside_the_app("filter-gap-low@example.com", base + 5)
+    email_filter.publish()
+    assert email_filter.contains("filter-gap-low@example.com", SessionLocal)
+    assert email_filter.stats()["pending_gaps"] == 8
@@ -0,0 +1,65 @@
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core import hashing, security
+from app.core.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    # A small queue so saturation is easy to reach, restored after each test
+    semaphore = threading.BoundedSemaphore(2)
+    monkeypatch.setattr(hashing, "_slots", semaphore)
+    return semaphore
+
+
+# Wait for the done callback that frees a slot (it may run just after result() returns)
+def _wait_for_free_slots(semaphore, count):
+    deadline = time.monotonic() + 5
+    while semaphore._value < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return semaphore._value
+
+
+def test_saturated_queue_raises(slots):
+    slots.acquire()
+    slots.acquire()
+    with pytest.raises(hashing.HashingPoolSaturated):
+        hashing.verify_password("password", security.dummy_password_hash())
+
+
+def test_saturated_queue_returns_503(slots):
+    slots.acquire()
+    slots.acquire()
+    response = client.post("/auth/login", json={"email": "hash-saturated@example.com", "password": "password"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_inline_path_hashes_and_releases_slots(slots, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    hashed = hashing.get_password_hash("inlinepassword")
+    assert hashing.verify_password("inlinepassword", hashed)
+    assert not hashing.verify_password("wrongpassword", hashed)
+    assert slots._value == 2
+    with pytest.raises(ValueError):
+        hashing.verify_password("inlinepassword", "not a hash")
+    assert slots._value == 2
+
+
+def test_process_pool_releases_slots_after_success_and_failure(slots, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    hashing.shutdown()
+    try:
+        hashed = security.get_pwd_context().hash("poolpassword")
+        assert hashing.verify_password("poolpassword", hashed)
+        assert _wait_for_free_slots(slots, 2) == 2
+        with pytest.raises(ValueError):
+            hashing.verify_password("poolpassword", "not a hash")
+        assert _wait_for_free_slots(slots, 2) == 2
+    finally:
+        hashing.shutdown()
@@ -0,0 +1,109 @@
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+from app.core import keys
+from app.core.config import settings
+from app.core.keys import KeySet
+from app.main import app
+
+client = TestClient(app)
+
+
+def _private_key(algorithm: str):
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _write_key(directory, kid: str, key, public_only: bool = False):
+    if public_only:
+        pem = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+        (directory / f"{kid}.pub.pem").write_bytes(pem)
+    else:
+        pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+        (directory / f"{kid}.pem").write_bytes(pem)
+
+
+@pytest.fixture
+def use_keyset(monkeypatch):
+    def install(algorithm: str, keyset):
+        monkeypatch.setattr(settings, "ALGORITHM", algorithm)
+        monkeypatch.setattr(keys, "_keyset", keyset)
+    return install
+
+
+def test_hs256_round_trip_and_empty_jwks():
+    token = keys.encode({"sub": "hs@example.com"})
+    assert "kid" not in jwt.get_unverified_header(token)
+    assert keys.decode(token)["sub"] == "hs@example.com"
+    assert client.get("/.well-known/jwks.json").json() == {"keys": []}
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256"])
+def test_asymmetric_round_trip_with_kid(tmp_path, use_keyset, algorithm):
+    _write_key(tmp_path, "2026-10", _private_key(algorithm))
+    use_keyset(algorithm, KeySet(algorithm, str(tmp_path)))
+    token = keys.encode({"sub": "rs@example.com"})
+    assert jwt.get_unverified_header(token)["kid"] == "2026-10"
+    assert keys.decode(token)["sub"] == "rs@example.com"
+    jwks = client.get("/.well-known/jwks.json").json()
+    assert [key["kid"] for key in jwks["keys"]] == ["2026-10"]
+
+
+def test_rotation_keeps_retired_kid_verifiable(tmp_path, use_keyset):
+    old = _private_key("RS256")
+    _write_key(tmp_path, "old", old)
+    keyset = KeySet("RS256", str(tmp_path), reload_seconds=0)
+    use_keyset("RS256", keyset)
+    old_token = keys.encode({"sub": "rotate@example.com"})
+
+    # Retire the old key to its public half and sign with the new one
+    (tmp_path / "old.pem").unlink()
+    _write_key(tmp_path, "old", old, public_only=True)
+    _write_key(tmp_path, "new", _private_key("RS256"))
+    new_token = keys.encode({"sub": "rotate@example.com"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert keys.decode(old_token)["sub"] == "rotate@example.com"
+    assert keys.decode(new_token)["sub"] == "rotate@example.com"
+
+
+def test_unknown_kid_is_rejected(tmp_path, use_keyset):
+    (tmp_path / "ours").mkdir()
+    (tmp_path / "theirs").mkdir()
+    _write_key(tmp_path / "ours", "ours", _private_key("RS256"))
+    _write_key(tmp_path / "theirs", "theirs", _private_key("RS256"))
+    use_keyset("RS256", KeySet("RS256", str(tmp_path / "theirs")))
+    foreign_token = keys.encode({"sub": "foreign@example.com"})
+    use_keyset("RS256", KeySet("RS256", str(tmp_path / "ours")))
+    with pytest.raises(JWTError):
+        keys.decode(foreign_token)
+
+
+def test_several_private_keys_need_an_active_kid(tmp_path):
+    _write_key(tmp_path, "a", _private_key("ES256"))
+    keyset = KeySet("ES256", str(tmp_path), reload_seconds=0)
+    assert keyset.signing_key()[0] == "a"
+
+    # A second private key dropped in without JWT_ACTIVE_KID doesn't start signing
+    _write_key(tmp_path, "b", _private_key("ES256"))
+    assert keyset.signing_key()[0] == "a"
+    with pytest.raises(RuntimeError):
+        KeySet("ES256", str(tmp_path)).signing_key()
+    with pytest.raises(RuntimeError):
+        KeySet("ES256", str(tmp_path), active_kid="missing").signing_key()
+    assert KeySet("ES256", str(tmp_path), active_kid="b").signing_key()[0] == "b"
+
+
+def test_jwks_etag_answers_304(tmp_path, use_keyset):
+    _write_key(tmp_path, "etag", _private_key("ES256"))
+    use_keyset("ES256", KeySet("ES256", str(tmp_path)))
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    response = client.get("/.well-known/jwks.json", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
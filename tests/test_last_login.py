@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from app.db import crud
+from app.db.session import SessionLocal
+from app.services.last_login import LastLoginWriter
+
+
+def _user(email: str):
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, email) or crud.create_user(db, email, "lastloginpassword")
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def test_repeated_logins_coalesce_into_one_batched_write():
+    first, second = _user("last-login-1@example.com"), _user("last-login-2@example.com")
+    writer = LastLoginWriter(resolution_seconds=60, max_pending=100)
+    for _ in range(5):
+        writer.record(first)
+    writer.record(second)
+    assert writer.pending() == 2
+
+    assert writer.flush() == 2
+    assert writer.flush() == 0
+    db = SessionLocal()
+    try:
+        for email in ("last-login-1@example.com", "last-login-2@example.com"):
+            assert crud.get_user_by_email(db, email).last_login_at is not None
+    finally:
+        db.close()
+    assert writer.stats()["flushes"] == 1
+
+
+def test_recent_last_login_is_not_rewritten():
+    user = _user("last-login-3@example.com")
+    writer = LastLoginWriter(resolution_seconds=60, max_pending=100)
+    user.last_login_at = datetime.now(timezone.utc) - timedelta(seconds=10)
+    writer.record(user)
+    assert writer.pending() == 0
+    assert writer.stats()["skipped"] == 1
+
+    user.last_login_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    writer.record(user)
+    assert writer.pending() == 1
+
+
+def test_full_buffer_drops_oldest_without_flushing():
+    first, second = _user("last-login-4@example.com"), _user("last-login-5@example.com")
+    writer = LastLoginWriter(resolution_seconds=60, max_pending=1)
+    writer.record(first)
+    writer.record(second)
+    assert writer.pending() == 1
+    assert writer.stats()["dropped"] == 1
+    assert writer.stats()["rows_written"] == 0
+    assert list(writer._pending) == [second.id]
+
+
+def test_flush_skips_deleted_users():
+    user = _user("last-login-6@example.com")
+    missing = SimpleNamespace(id=10**9, last_login_at=None)
+    writer = LastLoginWriter(resolution_seconds=60, max_pending=100)
+    writer.record(missing)
+    writer.record(user)
+    assert writer.flush() == 1
+    assert writer.pending() == 0
+    assert writer.stats()["rows_written"] == 1
+    db = SessionLocal()
+    try:
+        assert crud.get_user_by_email(db, "last-login-6@example.com").last_login_at is not None
+    finally:
+        db.close()
+
+
+def test_failed_flush_keeps_batch_within_bound():
+    users = [_user(f"last-login-{i}@example.com") for i in (7, 8, 9)]
+    writer = LastLoginWriter(resolution_seconds=60, max_pending=2)
+    writer.record(users[0])
+    writer.record(users[1])
+
+    class BrokenSession:
+        def execute(self, *args):
+            raise RuntimeError("database unavailable")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    with pytest.raises(RuntimeError):
+        writer.flush(BrokenSession)
+    assert writer.pending() == 2
+    writer.record(users[2])
+    assert list(writer._pending) == [users[1].id, users[2].id]
+    assert writer.flush() == 2
+
+
+def test_record_never_raises():
+    class Broken:
+        id = 1
+
+        @property
+        def last_login_at(self):
+            raise RuntimeError("detached")
+
+    writer = LastLoginWriter(resolution_seconds=60, max_pending=100)
+    writer.record(Broken())
+    assert writer.pending() == 0
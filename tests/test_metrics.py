@@ -0,0 +1,70 @@
+import asyncio
+import importlib
+from fastapi.testclient import TestClient
+import app.main
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, MetricsMiddleware, Registry, stage_duration, timed
+
+
+def test_counter_and_histogram_render_the_text_format():
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs run.", ["kind"]))
+    histogram = registry.register(Histogram("job_seconds", "Job time.", ["kind"], buckets=(0.1, 1.0)))
+    counter.inc("email")
+    counter.inc("email", amount=2)
+    histogram.observe(0.05, "email")
+    histogram.observe(0.5, "email")
+    histogram.observe(5, "email")
+    registry.register_collector(lambda: ["queue_depth 7"])
+
+    lines = registry.render().splitlines()
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{kind="email"} 3' in lines
+    assert 'job_seconds_bucket{kind="email",le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{kind="email",le="1.0"} 2' in lines
+    assert 'job_seconds_bucket{kind="email",le="+Inf"} 3' in lines
+    assert 'job_seconds_count{kind="email"} 3' in lines
+    assert lines[-1] == "queue_depth 7"
+
+
+def test_timed_records_sync_and_async_stages():
+    @timed("test_sync_stage")
+    def sync_stage():
+        return "sync"
+
+    @timed("test_async_stage")
+    async def async_stage():
+        return "async"
+
+    assert sync_stage() == "sync"
+    assert asyncio.run(async_stage()) == "async"
+    totals = stage_duration.totals()
+    assert totals[("test_sync_stage",)][1] == 1
+    assert totals[("test_async_stage",)][1] == 1
+
+
+def test_metrics_endpoint_renders_requests_and_components():
+    client = TestClient(app.main.app)
+    client.get("/.well-known/jwks.json")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/.well-known/jwks.json",status="200"}' in body
+    assert "# TYPE auth_token_cache_hits_total counter" in body
+    assert "# TYPE auth_stage_duration_seconds histogram" in body
+
+
+def test_disabled_metrics_leave_functions_and_app_uninstrumented(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+
+    def stage():
+        return "plain"
+
+    assert timed("disabled_stage")(stage) is stage
+    try:
+        module = importlib.reload(app.main)
+        assert all(middleware.cls is not MetricsMiddleware for middleware in module.app.user_middleware)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(app.main)
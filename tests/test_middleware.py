@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from app.core.middleware import SECURITY_HEADERS, RateLimitMiddleware, SecurityHeadersMiddleware
+from app.core.rate_limit import RateLimiter
+from app.core.storage import MemoryStorage, SQLiteStorage
+
+
+# The production stack in main.py order: rate limiting inside CORS and security headers
+def _client(limit: str) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/plain")
+    def plain():
+        return {"ok": True}
+
+    @app.get("/cacheable")
+    def cacheable():
+        return PlainTextResponse("ok", headers={"Cache-Control": "max-age=60"})
+
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(MemoryStorage(), limit))
+    app.add_middleware(CORSMiddleware, allow_origins=["*"])
+    app.add_middleware(SecurityHeadersMiddleware)
+    return TestClient(app)
+
+
+def test_security_headers_are_added_without_overriding_the_response():
+    client = _client("100/minute")
+    response = client.get("/plain")
+    for name, value in SECURITY_HEADERS:
+        assert response.headers[name.decode()] == value.decode()
+    response = client.get("/cacheable")
+    assert response.headers["cache-control"] == "max-age=60"
+    assert response.headers["x-frame-options"] == "DENY"
+
+
+def test_rate_limited_responses_carry_security_and_cors_headers():
+    client = _client("2/minute")
+    headers = {"Origin": "https://example.com"}
+    assert [client.get("/plain", headers=headers).status_code for _ in range(2)] == [200, 200]
+    response = client.get("/plain", headers=headers)
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Rate limit exceeded"}
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["access-control-allow-origin"] == "*"
+
+
+def test_shared_storage_is_counted_off_the_event_loop(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "counters.db"))
+    threads = []
+    incr = storage.incr
+
+    def recording_incr(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return incr(*args, **kwargs)
+
+    storage.incr = recording_incr
+    limiter = RateLimiter(storage, "2/minute")
+
+    async def hits():
+        return [await limiter.ahit("1.2.3.4") for _ in range(3)], threading.get_ident()
+
+    results, loop_thread = asyncio.run(hits())
+    assert results == [True, True, False]
+    assert loop_thread not in threads
@@ -0,0 +1,65 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import exc as sa_exc
+from app.api import deps
+from app.core.config import settings
+from app.core.token_cache import token_cache
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_stats
+from app.db.session import engine_kwargs
+from app.main import app
+
+client = TestClient(app)
+
+POOL_EMAIL = "pool-user@example.com"
+POOL_PASSWORD = "poolpassword"
+
+
+def test_engine_kwargs_use_the_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 2.5)
+    monkeypatch.setattr(settings, "DB_POOL_RECYCLE", 600)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+    kwargs = engine_kwargs("postgresql://user:secret@db/auth")
+    assert kwargs == {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": 7,
+        "max_overflow": 3,
+        "pool_timeout": 2.5,
+        "pool_recycle": 600,
+        "pool_pre_ping": False,
+    }
+    assert engine_kwargs("postgresql+asyncpg://db/auth", InstrumentedAsyncQueuePool)["poolclass"] is InstrumentedAsyncQueuePool
+
+
+def test_engine_kwargs_for_sqlite():
+    # Files get the tuned pool; in-memory databases keep SQLAlchemy's single-connection pool
+    assert engine_kwargs("sqlite:///./pool.db")["pool_size"] == settings.DB_POOL_SIZE
+    assert engine_kwargs("sqlite:///:memory:") == {"connect_args": {"check_same_thread": False}}
+
+
+def test_pool_timeout_returns_503(monkeypatch):
+    def exhausted(token):
+        raise sa_exc.TimeoutError("QueuePool limit reached")
+
+    monkeypatch.setattr(deps, "_decode_token", exhausted)
+    response = client.get("/auth/me", headers={"Authorization": "Bearer pool-timeout"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_cached_and_invalid_tokens_never_check_out_a_connection():
+    client.post("/auth/register", json={"email": POOL_EMAIL, "password": POOL_PASSWORD})
+    token = client.post("/auth/login", json={"email": POOL_EMAIL, "password": POOL_PASSWORD}).json()["access_token"]
+    token_cache.clear()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # A cache miss looks the user up once
+    before = pool_stats.snapshot()["checkouts"]
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert pool_stats.snapshot()["checkouts"] > before
+
+    # The cached token and a rejected token are answered without the database
+    before = pool_stats.snapshot()["checkouts"]
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+    assert pool_stats.snapshot()["checkouts"] == before
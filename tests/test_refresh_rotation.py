@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.db import crud
+from app.db.session import SessionLocal
+from app.services.user_service import issue_tokens, validate_and_rotate_refresh_token
+
+ROTATION_EMAIL = "rotation@example.com"
+
+
+def _rotate(refresh_token):
+    db = SessionLocal()
+    try:
+        return validate_and_rotate_refresh_token(db, refresh_token)
+    finally:
+        db.close()
+
+
+def test_parallel_refresh_rotates_once():
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, ROTATION_EMAIL) or crud.create_user(db, ROTATION_EMAIL, "rotationpassword")
+        _, refresh_token = issue_tokens(db, user)
+    finally:
+        db.close()
+
+    # Fire the same refresh token from several threads at once
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(_rotate, [refresh_token] * 8))
+
+    winners = [pair for pair in results if pair[0] is not None]
+    assert len(winners) == 1
+
+    # The new refresh token works once; the old one stays dead
+    _, new_refresh_token = winners[0]
+    assert _rotate(refresh_token) == (None, None)
+    assert _rotate(new_refresh_token)[0] is not None
+    assert _rotate(new_refresh_token) == (None, None)
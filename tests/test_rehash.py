@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from passlib.hash import bcrypt, pbkdf2_sha256
+from app.core import security
+from app.core.config import settings
+from app.db import crud
+from app.db.session import SessionLocal, get_async_sessionmaker
+from app.services import async_user_service, user_service
+
+REHASH_PASSWORD = "rehashpassword"
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch):
+    # Hash inline at a low cost; accept pbkdf2_sha256 as a deprecated scheme
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEMES", "bcrypt,pbkdf2_sha256")
+    security.get_pwd_context.cache_clear()
+    yield
+    security.get_pwd_context.cache_clear()
+
+
+def _user_with_hash(email: str, hashed_password: str):
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, email) or crud.create_user(db, email, REHASH_PASSWORD)
+        crud.update_password_hash(db, user, hashed_password)
+    finally:
+        db.close()
+
+
+def _stored_hash(email: str) -> str:
+    db = SessionLocal()
+    try:
+        return crud.get_user_by_email(db, email).hashed_password
+    finally:
+        db.close()
+
+
+def _login_sync(email: str):
+    db = SessionLocal()
+    try:
+        return user_service.authenticate_user(db, email, REHASH_PASSWORD)
+    finally:
+        db.close()
+
+
+def _login_async(email: str):
+    async def login():
+        async with get_async_sessionmaker()() as db:
+            return await async_user_service.authenticate_user(db, email, REHASH_PASSWORD)
+    return asyncio.run(login())
+
+
+@pytest.mark.parametrize("login", [_login_sync, _login_async], ids=["sync", "async"])
+@pytest.mark.parametrize("old_hash", [bcrypt.using(rounds=4), pbkdf2_sha256], ids=["lower-rounds", "other-scheme"])
+def test_outdated_hash_is_upgraded_on_login(fast_hashing, login, old_hash):
+    email = f"rehash-{login.__name__}-{old_hash.name}-{old_hash.default_rounds}@example.com"
+    _user_with_hash(email, old_hash.hash(REHASH_PASSWORD))
+
+    assert login(email) is not None
+    upgraded = _stored_hash(email)
+    assert upgraded.startswith("$2b$05$")
+    assert security.verify_password(REHASH_PASSWORD, upgraded)
+
+    # Already current: a second login leaves the hash alone
+    assert login(email) is not None
+    assert _stored_hash(email) == upgraded
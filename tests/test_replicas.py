@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from sqlalchemy import exc as sa_exc, insert
+from app.db import async_crud, crud, models
+from app.db.base import Base
+from app.db.replicas import replica_router
+from app.db.session import SessionLocal, get_async_sessionmaker
+from app.services import user_service
+
+REPLICA_ONLY_EMAIL = "replica-only@example.com"
+PRIMARY_EMAIL = "replica-primary@example.com"
+CHANGED_EMAIL = "replica-changed@example.com"
+
+
+def _get_user(email, replica):
+    db = SessionLocal()
+    try:
+        return crud.get_user_by_email(db, email, replica=replica)
+    finally:
+        db.close()
+
+
+def _get_user_async(email, replica):
+    async def run():
+        async with get_async_sessionmaker()() as db:
+            return await async_crud.get_user_by_email(db, email, replica=replica)
+    return asyncio.run(run())
+
+
+def _create_primary_user():
+    db = SessionLocal()
+    try:
+        crud.get_user_by_email(db, PRIMARY_EMAIL) or crud.create_user(db, PRIMARY_EMAIL, "replicapassword")
+    finally:
+        db.close()
+
+
+def test_reads_are_routed_to_replica_with_primary_confirmation(tmp_path):
+    _create_primary_user()
+    replica_router.configure([f"sqlite:///{tmp_path}/replica.db"])
+    try:
+        replica = replica_router.replicas[0]
+        Base.metadata.create_all(bind=replica.engine)
+        with replica.engine.begin() as connection:
+            connection.execute(insert(models.User).values(email=REPLICA_ONLY_EMAIL, hashed_password="unused"))
+
+        # Replica-eligible reads hit the replica; default reads stay on the primary
+        assert _get_user(REPLICA_ONLY_EMAIL, replica=True) is not None
+        assert _get_user(REPLICA_ONLY_EMAIL, replica=False) is None
+        # A row the replica hasn't caught up on is confirmed on the primary
+        assert _get_user(PRIMARY_EMAIL, replica=True) is not None
+        assert replica.healthy and replica.reads == 2
+    finally:
+        replica_router.configure([])
+
+
+def test_failed_replica_falls_back_to_primary(tmp_path):
+    _create_primary_user()
+    replica_router.configure([f"sqlite:///{tmp_path}/missing/replica.db"])
+    try:
+        replica = replica_router.replicas[0]
+        assert _get_user(PRIMARY_EMAIL, replica=True) is not None
+        assert not replica.healthy and replica.failures == 1
+
+        # Out of rotation: reads go straight to the primary until a health check passes
+        assert _get_user(PRIMARY_EMAIL, replica=True) is not None
+        assert replica.reads == 1
+        replica_router.check()
+        assert not replica.healthy
+        (tmp_path / "missing").mkdir()
+        replica_router.check()
+        assert replica.healthy
+    finally:
+        replica_router.configure([])
+
+
+def test_async_reads_are_routed_to_replica(tmp_path):
+    _create_primary_user()
+    replica_router.configure([f"sqlite:///{tmp_path}/replica.db"])
+    try:
+        replica = replica_router.replicas[0]
+        Base.metadata.create_all(bind=replica.engine)
+        with replica.engine.begin() as connection:
+            connection.execute(insert(models.User).values(email=REPLICA_ONLY_EMAIL, hashed_password="unused"))
+
+        assert _get_user_async(REPLICA_ONLY_EMAIL, replica=True) is not None
+        assert _get_user_async(REPLICA_ONLY_EMAIL, replica=False) is None
+        assert _get_user_async(PRIMARY_EMAIL, replica=True) is not None
+        assert replica.healthy and replica.reads == 2
+    finally:
+        replica_router.configure([])
+
+
+def test_async_failed_replica_falls_back_to_primary(tmp_path):
+    _create_primary_user()
+    replica_router.configure([f"sqlite:///{tmp_path}/missing/replica.db"])
+    try:
+        replica = replica_router.replicas[0]
+        assert _get_user_async(PRIMARY_EMAIL, replica=True) is not None
+        assert not replica.healthy and replica.failures == 1
+    finally:
+        replica_router.configure([])
+
+
+@pytest.mark.parametrize(
+    "error", [sa_exc.TimeoutError("QueuePool limit reached"), ConnectionRefusedError("replica down")], ids=["pool-timeout", "oserror"]
+)
+@pytest.mark.parametrize("get_user", [_get_user, _get_user_async], ids=["sync", "async"])
+def test_replica_checkout_errors_fall_back_to_primary(tmp_path, monkeypatch, get_user, error):
+    _create_primary_user()
+    replica_router.configure([f"sqlite:///{tmp_path}/replica.db"])
+    try:
+        replica = replica_router.replicas[0]
+
+        def fail(*args, **kwargs):
+            raise error
+
+        monkeypatch.setattr(replica.engine, "connect", fail)
+        monkeypatch.setattr(replica.async_engine.sync_engine, "connect", fail)
+        assert get_user(PRIMARY_EMAIL, replica=True) is not None
+        assert not replica.healthy and replica.failures == 1
+        assert type(error).__name__ in replica.last_error
+    finally:
+        replica_router.configure([])
+
+
+def test_changed_user_is_read_from_primary(tmp_path):
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, CHANGED_EMAIL) or crud.create_user(db, CHANGED_EMAIL, "oldpassword")
+        replica_router.configure([f"sqlite:///{tmp_path}/replica.db"])
+        replica = replica_router.replicas[0]
+        Base.metadata.create_all(bind=replica.engine)
+        # The replica keeps the row as it was before the password change
+        with replica.engine.begin() as connection:
+            connection.execute(insert(models.User).values(email=CHANGED_EMAIL, hashed_password=user.hashed_password))
+
+        assert user_service.change_user_password(db, user, "oldpassword", "newpassword")
+        assert replica_router.recently_changed(CHANGED_EMAIL)
+        assert user_service.authenticate_user(db, CHANGED_EMAIL, "oldpassword") is None
+        assert user_service.authenticate_user(db, CHANGED_EMAIL, "newpassword") is not None
+        assert _get_user_async(CHANGED_EMAIL, replica=True).tokens_valid_after is not None
+        assert replica.reads == 0
+    finally:
+        replica_router.configure([])
+        db.close()
@@ -0,0 +1,46 @@
+import json
+import sys
+import pytest
+from fastapi.testclient import TestClient
+from app.core import responses
+from app.core.config import settings
+from app.core.responses import FastJSONResponse, json_response, load_encoder
+from app.main import app
+
+CONTENT = {"email": "jsön@example.com", "ids": [1, 2], "ok": True, "none": None}
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson", "msgspec"])
+def test_backends_encode_the_same_document(backend):
+    name, encode = load_encoder(backend)
+    assert name == backend
+    assert json.loads(encode(CONTENT)) == CONTENT
+
+
+def test_auto_falls_back_when_a_library_is_missing(monkeypatch):
+    assert load_encoder("auto")[0] == "orjson"
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    assert load_encoder("auto")[0] == "msgspec"
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+    assert load_encoder("auto")[0] == "json"
+    with pytest.raises(ImportError):
+        load_encoder("orjson")
+    with pytest.raises(ValueError):
+        load_encoder("ujson")
+
+
+def test_fast_json_response_and_json_response_render_with_the_encoder():
+    response = FastJSONResponse(CONTENT)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == CONTENT
+    response = json_response(CONTENT, status_code=201)
+    assert response.status_code == 201
+    assert json.loads(response.body) == CONTENT
+
+
+def test_bad_backend_fails_at_startup(monkeypatch):
+    monkeypatch.setattr(responses, "_encoder", None)
+    monkeypatch.setattr(settings, "JSON_RESPONSE_BACKEND", "ujson")
+    with pytest.raises(ValueError):
+        with TestClient(app):
+            pass
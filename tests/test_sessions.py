@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+SESSIONS_EMAIL = "sessions@example.com"
+SESSIONS_PASSWORD = "sessionspassword"
+
+
+def _login():
+    response = client.post("/auth/login", json={"email": SESSIONS_EMAIL, "password": SESSIONS_PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_list_and_revoke_sessions():
+    client.post("/auth/register", json={"email": SESSIONS_EMAIL, "password": SESSIONS_PASSWORD})
+    first, second = _login(), _login()
+    headers = {"Authorization": f"Bearer {second['access_token']}"}
+
+    # Both logins show up as sessions; revoking one kills its refresh token only
+    sessions = client.get("/auth/sessions", headers=headers).json()
+    assert len(sessions) == 2
+    response = client.delete(f"/auth/sessions/{sessions[-1]['id']}", headers=headers)
+    assert response.status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]}).status_code == 401
+    assert len(client.get("/auth/sessions", headers=headers).json()) == 1
+
+    # Revoking all sessions rejects outstanding refresh and access tokens, including cached ones
+    response = client.delete("/auth/sessions", headers=headers)
+    assert response.json()["revoked"] == 1
+    assert client.post("/auth/refresh", json={"refresh_token": second["refresh_token"]}).status_code == 401
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {first['access_token']}"}).status_code == 401
+
+    # Tokens issued afterwards work
+    third = _login()
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {third['access_token']}"}).status_code == 200
@@ -0,0 +1,121 @@
+import threading
+import time
+import pytest
+from app.core import storage as storage_module
+from app.core.config import settings
+from app.core.storage import MemoryStorage, SQLiteStorage, RedisStorage
+from app.core.rate_limit import RateLimiter
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the redis-py commands RedisStorage uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._live(key) is not None:
+            return None
+        self.data[key] = [int(value), time.time() + ex if ex else None]
+        return True
+
+    def incrby(self, key, amount):
+        entry = self._live(key) or self.data.setdefault(key, [0, None])
+        entry[0] += amount
+        return entry[0]
+
+    def get(self, key):
+        entry = self._live(key)
+        return str(entry[0]).encode() if entry else None
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def storage(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStorage()
+    if request.param == "sqlite":
+        return SQLiteStorage(str(tmp_path / "counters.db"))
+    return RedisStorage(FakeRedis())
+
+
+def test_incr_and_expiry(storage):
+    assert storage.incr("key", 1) == 1
+    assert storage.incr("key", 1, amount=2) == 3
+    assert storage.get("key") == 3
+    time.sleep(1.1)
+    assert storage.get("key") == 0
+    assert storage.incr("key", 1) == 1
+
+
+def test_delete(storage):
+    storage.incr("key", 60)
+    storage.delete("key")
+    assert storage.get("key") == 0
+
+
+def test_sqlite_storage_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "counters.db")
+    first, second = SQLiteStorage(path), SQLiteStorage(path)
+    first.incr("key", 60)
+    assert second.incr("key", 60) == 2
+
+
+def test_sqlite_storage_connections_use_wal_without_commit_fsync(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "counters.db"))
+    connections = [storage._connect()]
+    thread = threading.Thread(target=lambda: connections.append(storage._connect()))
+    thread.start()
+    thread.join()
+    for conn in connections:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_sqlite_storage_purges_every_expired_key(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "counters.db"))
+    for window in range(5):
+        storage.incr(f"rate:1.2.3.4:{window}", 1)
+    time.sleep(1.1)
+    storage._next_purge = 0
+    storage.incr("other", 60)
+    count = storage._connect().execute("SELECT COUNT(*) FROM counters").fetchone()[0]
+    assert count == 1
+
+
+def test_memory_storage_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(storage_module, "_counter_storage", None)
+    monkeypatch.setattr(settings, "COUNTER_STORAGE_URI", "memory://")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    with pytest.raises(ValueError):
+        storage_module.get_counter_storage()
+
+
+def test_rate_limiter(storage):
+    limiter = RateLimiter(storage, "3/minute")
+    assert [limiter.hit("1.2.3.4") for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit("5.6.7.8")
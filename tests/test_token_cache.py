@@ -0,0 +1,49 @@
+import time
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.token_cache import TokenCache
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_entries_expire_at_the_token_exp():
+    cache = TokenCache(maxsize=10, ttl_seconds=60)
+    cache.set("short", {"sub": "a@example.com", "exp": time.time() + 0.2}, "user")
+    cache.set("long", {"sub": "a@example.com", "exp": time.time() + 3600}, "user")
+    assert cache.get("short")[1] == "user"
+    time.sleep(0.3)
+    assert cache.get("short") is None
+    assert cache.get("long") is not None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(maxsize=2, ttl_seconds=60)
+    cache.set("first", {"sub": "a@example.com"}, "a")
+    cache.set("second", {"sub": "b@example.com"}, "b")
+    cache.get("first")
+    cache.set("third", {"sub": "c@example.com"}, "c")
+    assert cache.get("second") is None
+    assert cache.get("first") is not None and cache.get("third") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_subject_drops_only_that_subjects_tokens():
+    cache = TokenCache(maxsize=10, ttl_seconds=60)
+    cache.set("a1", {"sub": "a@example.com"}, "a")
+    cache.set("a2", {"sub": "a@example.com"}, "a")
+    cache.set("b1", {"sub": "b@example.com"}, "b")
+    cache.invalidate_subject("a@example.com")
+    assert cache.get("a1") is None and cache.get("a2") is None
+    assert cache.get("b1") is not None
+    assert cache.stats()["size"] == 1
+
+
+def test_monitoring_requires_the_admin_key(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "")
+    assert client.get("/monitoring/token-cache").status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "monitoring-key")
+    assert client.get("/monitoring/token-cache").status_code == 403
+    response = client.get("/monitoring/token-cache", headers={"X-Admin-Key": "monitoring-key"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"size", "maxsize", "hits", "misses", "evictions"}
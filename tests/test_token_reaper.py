@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from app.db import crud, models
+from app.db.session import SessionLocal
+from app.services.token_reaper import purge_expired_refresh_tokens, reaper_stats
+
+REAPER_EMAIL = "reaper@example.com"
+
+
+def _count(db, user_id, expired):
+    now = datetime.utcnow()
+    condition = models.RefreshToken.expires_at < now if expired else models.RefreshToken.expires_at >= now
+    return db.scalar(select(func.count()).select_from(models.RefreshToken).where(models.RefreshToken.user_id == user_id, condition))
+
+
+def test_expired_tokens_are_purged_in_paused_batches():
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, REAPER_EMAIL) or crud.create_user(db, REAPER_EMAIL, "reaperpassword")
+        past, future = datetime.utcnow() - timedelta(days=1), datetime.utcnow() + timedelta(days=1)
+        for i in range(5):
+            crud.create_refresh_token(db, user.id, f"expired-{i}", past)
+        crud.create_refresh_token(db, user.id, "live", future)
+
+        # Batches of 2: three batches (2, 2, 1) with a pause before each of the last two
+        started = time.perf_counter()
+        purged = purge_expired_refresh_tokens(batch_size=2, pause_seconds=0.1)
+        assert time.perf_counter() - started >= 0.2
+        assert purged >= 5
+        assert reaper_stats["last_run_purged"] == purged
+        assert _count(db, user.id, expired=True) == 0
+        assert _count(db, user.id, expired=False) == 1
+    finally:
+        db.close()
+
+
+def test_max_batches_bounds_a_run():
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, REAPER_EMAIL) or crud.create_user(db, REAPER_EMAIL, "reaperpassword")
+        past = datetime.utcnow() - timedelta(days=1)
+        for i in range(3):
+            crud.create_refresh_token(db, user.id, f"bounded-{i}", past)
+        assert purge_expired_refresh_tokens(batch_size=1, max_batches=2, pause_seconds=0) == 2
+        assert _count(db, user.id, expired=True) == 1
+        assert crud.delete_expired_refresh_tokens(db, datetime.utcnow(), 10) == 1
+    finally:
+        db.close()